@@ -0,0 +1,182 @@
+from collections import namedtuple
+from datetime import date
+
+from django.core.exceptions import ValidationError
+
+from .models import Attendance, Employee, Holiday, LeaveRequest
+from .pagination import keyset_paginate
+from .utils import calculate_attendance_stats
+
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 500
+
+# What calculate_attendance_stats reads from an employee, without a model instance
+EmployeeDates = namedtuple('EmployeeDates', ['pk', 'date_hired'])
+
+PERCENTAGE_FIELDS = ('employee_id', 'present', 'absent', 'leave', 'percentage')
+
+
+class ApiError(ValueError):
+    """A bad query parameter; the view answers 400 with the message."""
+
+
+class Resource:
+    """
+    One read-only list endpoint of the JSON API.
+
+    `fields` are the columns a client may select with ?fields=, `ordering`
+    the keyset the cursors seek on, `since` the date field ?since= bounds
+    from below, and `filters` maps query parameters to exact lookups.
+    Non-HR users only see rows whose `owner` field is their own employee
+    id; a resource without an owner is visible to everyone signed in.
+    """
+
+    def __init__(self, model, fields, ordering, since=None, owner=None, filters=None):
+        self.model = model
+        self.fields = fields
+        self.ordering = ordering
+        self.since = since
+        self.owner = owner
+        self.filters = filters or {}
+
+    def queryset(self, identity):
+        queryset = self.model._default_manager.all()
+        if self.owner and not identity.is_hr:
+            if identity.employee is None:
+                return queryset.none()
+            queryset = queryset.filter(**{self.owner: identity.employee.pk})
+        return queryset
+
+    def page(self, identity, params):
+        """One page of rows as dicts, plus the cursors around it."""
+        fields = parse_fields(params, self.fields)
+        queryset = self.queryset(identity)
+        since = parse_since(params)
+        if since and self.since:
+            queryset = queryset.filter(**{f'{self.since}__gte': since})
+        queryset = apply_filters(queryset, params, self.filters)
+
+        # The cursor needs the ordering columns even when they were not selected
+        keys = [name for name in (field.lstrip('-') for field in self.ordering) if name not in fields]
+        page = keyset_paginate(
+            queryset.values(*fields, *keys),
+            self.ordering,
+            after=params.get('after'),
+            before=params.get('before'),
+            page_size=parse_limit(params),
+        )
+        rows = page.object_list
+        if keys:
+            rows = [{name: row[name] for name in fields} for row in rows]
+        return rows, page
+
+
+RESOURCES = {
+    'employees': Resource(
+        Employee,
+        fields=('id', 'first_name', 'last_name', 'email', 'position', 'department', 'date_hired'),
+        ordering=['id'],
+        since='date_hired',
+        owner='id',
+        filters={'department': 'department'},
+    ),
+    'attendance': Resource(
+        Attendance,
+        fields=('id', 'employee_id', 'date', 'status'),
+        ordering=['date', 'id'],
+        since='date',
+        owner='employee_id',
+        filters={'employee': 'employee_id', 'status': 'status'},
+    ),
+    'leave-requests': Resource(
+        LeaveRequest,
+        fields=('id', 'employee_id', 'start_date', 'end_date', 'reason', 'status'),
+        ordering=['start_date', 'id'],
+        # Requests still running on or after the date
+        since='end_date',
+        owner='employee_id',
+        filters={'employee': 'employee_id', 'status': 'status'},
+    ),
+    'holidays': Resource(
+        Holiday,
+        fields=('id', 'name', 'date'),
+        ordering=['date', 'id'],
+        since='date',
+    ),
+}
+
+
+def parse_fields(params, allowed):
+    """The ?fields= selection in the resource's column order; all columns if absent."""
+    value = params.get('fields')
+    if not value:
+        return list(allowed)
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(sorted(unknown))}. Available: {', '.join(allowed)}.")
+    return [name for name in allowed if name in requested]
+
+
+def parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(f"{name} must be a date in YYYY-MM-DD format.")
+
+
+def parse_since(params):
+    return parse_date_param(params, 'since')
+
+
+def parse_limit(params):
+    value = params.get('limit')
+    if not value:
+        return API_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= API_MAX_PAGE_SIZE:
+        raise ApiError(f"limit must be a whole number from 1 to {API_MAX_PAGE_SIZE}.")
+    return limit
+
+
+def apply_filters(queryset, params, filters):
+    for name, lookup in filters.items():
+        value = params.get(name)
+        if value:
+            try:
+                queryset = queryset.filter(**{lookup: value})
+            except (ValidationError, ValueError):
+                raise ApiError(f"Invalid value for {name}: {value!r}.")
+    return queryset
+
+
+def attendance_percentages(identity, params):
+    """
+    Attendance percentages for a page of employees, as of ?as_of= (today by
+    default), from the same counts the attendance summary shows.
+    """
+    fields = parse_fields(params, PERCENTAGE_FIELDS)
+    end_date = parse_date_param(params, 'as_of') or date.today()
+    queryset = apply_filters(
+        RESOURCES['employees'].queryset(identity), params, {'employee': 'id', 'department': 'department'}
+    )
+    page = keyset_paginate(
+        queryset.values('id', 'date_hired'),
+        ['id'],
+        after=params.get('after'),
+        before=params.get('before'),
+        page_size=parse_limit(params),
+    )
+    employees = [EmployeeDates(row['id'], row['date_hired']) for row in page]
+    stats = calculate_attendance_stats(employees, end_date)
+    rows = [
+        {name: employee.pk if name == 'employee_id' else stats[employee.pk][name] for name in fields}
+        for employee in employees
+    ]
+    return rows, page
@@ -5,4 +5,5 @@ class EmployeeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'employee'
 
-
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.db import transaction
+
+from .counters import tracking_attendance
+from .models import Attendance, Employee
+from .rollups import rebuild_attendance_rollup
+from .versions import touch
+from .workdays import get_working_calendar
+
+BATCH_SIZE = 500
+
+
+def working_days_in_range(start_date, end_date):
+    """The working days between start_date and end_date inclusive, in order."""
+    calendar = get_working_calendar(start_date, max(start_date, end_date))
+    days = []
+    current = start_date
+    while current <= end_date:
+        if calendar.is_working_day(current):
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+def bulk_mark_attendance(employees, days, default_status, overrides=None, overwrite=True):
+    """
+    Write one Attendance row per employee per day in a single transaction.
+
+    overrides maps employee id to a status that replaces default_status
+    for that employee. Days before an employee's hire date are skipped.
+    With overwrite, existing rows for the same employee and day take the
+    new status; otherwise they are left alone. Returns the number of rows
+    sent to the database.
+    """
+    overrides = overrides or {}
+    days = sorted(days)
+    if not days:
+        return 0
+
+    hires = list(employees.values_list('id', 'date_hired'))
+    if overwrite:
+        conflict_options = {
+            'update_conflicts': True,
+            'unique_fields': ['employee', 'date'],
+            'update_fields': ['status'],
+        }
+    else:
+        conflict_options = {'ignore_conflicts': True}
+
+    written = 0
+    with transaction.atomic():
+        for i in range(0, len(hires), BATCH_SIZE):
+            chunk = hires[i:i + BATCH_SIZE]
+            records = [
+                Attendance(employee_id=pk, date=day, status=overrides.get(pk, default_status))
+                for pk, hired in chunk
+                for day in days
+                if day >= hired
+            ]
+            with tracking_attendance([pk for pk, _ in chunk], days[0], days[-1]):
+                Attendance.objects.bulk_create(records, batch_size=BATCH_SIZE, **conflict_options)
+            written += len(records)
+
+        # Bulk writes skip the model signals, so refresh the rollup and data version here
+        touch(Attendance)
+        rebuild_attendance_rollup(
+            Employee.objects.filter(pk__in=[pk for pk, _ in hires]), days[0], days[-1]
+        )
+    return written
@@ -1,14 +1,28 @@
+from django.utils.functional import SimpleLazyObject
+
+from .identity import Identity, get_identity
+
+
 def employee_context(request):
-    """Add employee data to all template contexts."""
-    context = {}
-    if request.user.is_authenticated:
-        try:
-            from .models import Employee
-            employee = Employee.objects.get(user=request.user)
-            context['employee'] = employee
-            context['employee_name'] = f"{employee.first_name} {employee.last_name}".strip()
-        except Employee.DoesNotExist:
-            context['employee'] = None
-            context['employee_name'] = None
-    return context
+    """
+    Add employee data to all template contexts.
+
+    The values are lazy: nothing is queried unless a template actually
+    reads them, and the lookup is shared with the rest of the request.
+    """
+    def identity():
+        if request.user.is_authenticated:
+            return get_identity(request.user)
+        return Identity()
+
+    def employee_name():
+        employee = identity().employee
+        if employee is None:
+            return None
+        return f"{employee.first_name} {employee.last_name}".strip()
 
+    return {
+        'employee': SimpleLazyObject(lambda: identity().employee),
+        'employee_name': SimpleLazyObject(employee_name),
+        'is_hr': SimpleLazyObject(lambda: identity().is_hr),
+    }
@@ -0,0 +1,226 @@
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from .models import Attendance, DashboardCounter, Employee, LeaveRequest
+
+# Global keys; per-employee keys are "employee:<id>:<name>" and per-day
+# attendance keys "day:<YYYY-MM-DD>:<status>".
+EMPLOYEES = 'employees'
+ATTENDANCE = 'attendance'
+LEAVE_REQUESTS = 'leave_requests'
+LEAVE_PENDING = 'leave_pending'
+
+BATCH_SIZE = 500
+
+
+def employee_key(name, employee_id):
+    return f'employee:{employee_id}:{name}'
+
+
+def day_key(day, status):
+    return f'day:{day.isoformat()}:{status}'
+
+
+def attendance_contribution(employee_id, day, status):
+    return Counter({ATTENDANCE: 1, employee_key(ATTENDANCE, employee_id): 1, day_key(day, status): 1})
+
+
+def leave_contribution(employee_id, status):
+    counts = Counter({LEAVE_REQUESTS: 1, employee_key(LEAVE_REQUESTS, employee_id): 1})
+    if status == 'Pending':
+        counts[LEAVE_PENDING] += 1
+        counts[employee_key(LEAVE_PENDING, employee_id)] += 1
+    return counts
+
+
+def bump(deltas):
+    """Add each delta to its counter, creating missing counters, in one statement batch."""
+    rows = [(key, value) for key, value in deltas.items() if value]
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    table, key, value = quote(DashboardCounter._meta.db_table), quote('key'), quote('value')
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} ({key}, {value}) VALUES (%s, %s) '
+            f'ON CONFLICT ({key}) DO UPDATE SET {value} = {table}.{value} + excluded.{value}',
+            rows,
+        )
+
+
+def diff(old, new):
+    """Deltas that turn the `old` contribution into the `new` one."""
+    deltas = Counter(new)
+    deltas.subtract(old)
+    return deltas
+
+
+def read_counters(*keys):
+    values = dict(DashboardCounter.objects.filter(key__in=keys).values_list('key', 'value'))
+    return {key: values.get(key, 0) for key in keys}
+
+
+async def aread_counters(*keys):
+    values = {key: value async for key, value in DashboardCounter.objects.filter(key__in=keys).values_list('key', 'value')}
+    return {key: values.get(key, 0) for key in keys}
+
+
+def dashboard_keys(today):
+    """The counter behind each figure on the HR dashboard."""
+    return {
+        'total_employees': EMPLOYEES,
+        'total_attendance': ATTENDANCE,
+        'total_leave_requests': LEAVE_REQUESTS,
+        'pending_leave_requests': LEAVE_PENDING,
+        'present_today': day_key(today, 'Present'),
+        'absent_today': day_key(today, 'Absent'),
+        'on_leave_today': day_key(today, 'Leave'),
+    }
+
+
+def employee_keys(employee_id):
+    """The counters behind each figure on an employee's own dashboard."""
+    return {
+        'total_attendance': employee_key(ATTENDANCE, employee_id),
+        'total_leave_requests': employee_key(LEAVE_REQUESTS, employee_id),
+        'pending_leave_requests': employee_key(LEAVE_PENDING, employee_id),
+    }
+
+
+def dashboard_counts(today=None):
+    """Everything the HR dashboard shows, in one query."""
+    keys = dashboard_keys(today or date.today())
+    counts = read_counters(*keys.values())
+    return {name: counts[key] for name, key in keys.items()}
+
+
+async def adashboard_counts(today=None):
+    keys = dashboard_keys(today or date.today())
+    counts = await aread_counters(*keys.values())
+    return {name: counts[key] for name, key in keys.items()}
+
+
+def employee_counts(employee_id):
+    keys = employee_keys(employee_id)
+    counts = read_counters(*keys.values())
+    return {name: counts[key] for name, key in keys.items()}
+
+
+async def aemployee_counts(employee_id):
+    keys = employee_keys(employee_id)
+    counts = await aread_counters(*keys.values())
+    return {name: counts[key] for name, key in keys.items()}
+
+
+def _attendance_counts(records):
+    """Per-employee and per-day counters for a queryset of Attendance rows."""
+    counts = Counter()
+    for row in records.values('employee_id').annotate(n=Count('id')).order_by():
+        counts[employee_key(ATTENDANCE, row['employee_id'])] = row['n']
+    for row in records.values('date', 'status').annotate(n=Count('id')).order_by():
+        counts[day_key(row['date'], row['status'])] += row['n']
+    return counts
+
+
+def _scoped_attendance_counts(employee_ids, start_date, end_date):
+    counts = Counter()
+    for i in range(0, len(employee_ids), BATCH_SIZE):
+        counts.update(
+            _attendance_counts(
+                Attendance.objects.filter(
+                    employee_id__in=employee_ids[i:i + BATCH_SIZE],
+                    date__range=(start_date, end_date),
+                )
+            )
+        )
+    return counts
+
+
+@contextmanager
+def tracking_attendance(employee_ids, start_date, end_date):
+    """
+    Keep the attendance counters right across a bulk write (bulk_create and
+    upserts skip the signals) limited to `employee_ids` between start_date
+    and end_date: the rows in that scope are counted before and after and
+    the difference is applied. Use inside the write's transaction.
+    """
+    employee_ids = list(employee_ids)
+    before = _scoped_attendance_counts(employee_ids, start_date, end_date)
+    yield
+    after = _scoped_attendance_counts(employee_ids, start_date, end_date)
+    deltas = diff(before, after)
+    deltas[ATTENDANCE] = sum(value for key, value in deltas.items() if key.startswith('employee:'))
+    bump(deltas)
+
+
+def employee_contribution(employee_id):
+    """Everything an employee adds to the counters, to take back out when it is deleted."""
+    counts = _attendance_counts(Attendance.objects.filter(employee_id=employee_id))
+    counts[ATTENDANCE] = counts[employee_key(ATTENDANCE, employee_id)]
+    leaves = LeaveRequest.objects.filter(employee_id=employee_id).aggregate(
+        total=Count('id'), pending=Count('id', filter=Q(status='Pending'))
+    )
+    counts[LEAVE_REQUESTS] = counts[employee_key(LEAVE_REQUESTS, employee_id)] = leaves['total']
+    counts[LEAVE_PENDING] = counts[employee_key(LEAVE_PENDING, employee_id)] = leaves['pending']
+    counts[EMPLOYEES] = 1
+    return counts
+
+
+def forget_employee(employee_id, contribution):
+    with transaction.atomic():
+        bump(diff(contribution, {}))
+        DashboardCounter.objects.filter(key__startswith=f'employee:{employee_id}:').delete()
+
+
+def count_pending_by_employee(leaves):
+    """Per-employee pending counts of a LeaveRequest queryset, as negative counter deltas."""
+    deltas = Counter()
+    for row in leaves.filter(status='Pending').values('employee_id').annotate(n=Count('id')).order_by():
+        deltas[LEAVE_PENDING] -= row['n']
+        deltas[employee_key(LEAVE_PENDING, row['employee_id'])] -= row['n']
+    return deltas
+
+
+def real_counts():
+    """Every counter computed from the source tables."""
+    counts = _attendance_counts(Attendance.objects.all())
+    counts[EMPLOYEES] = Employee.objects.count()
+    counts[ATTENDANCE] = Attendance.objects.count()
+    leaves = (
+        LeaveRequest.objects.values('employee_id')
+        .annotate(total=Count('id'), pending=Count('id', filter=Q(status='Pending')))
+        .order_by()
+    )
+    for row in leaves:
+        counts[employee_key(LEAVE_REQUESTS, row['employee_id'])] = row['total']
+        counts[employee_key(LEAVE_PENDING, row['employee_id'])] = row['pending']
+        counts[LEAVE_REQUESTS] += row['total']
+        counts[LEAVE_PENDING] += row['pending']
+    return counts
+
+
+def reconcile_counters(fix=True):
+    """
+    Compare every counter with a real count and, with fix=True, rewrite the
+    ones that drifted and drop those with nothing left to count. Returns
+    {key: (stored, real)} for the counters that were wrong.
+    """
+    with transaction.atomic():
+        real = real_counts()
+        stored = dict(DashboardCounter.objects.values_list('key', 'value'))
+        drift = {
+            key: (stored.get(key, 0), real.get(key, 0))
+            for key in set(real) | set(stored)
+            if stored.get(key, 0) != real.get(key, 0) or (key in stored and not real.get(key))
+        }
+        if fix and drift:
+            DashboardCounter.objects.filter(key__in=list(drift)).delete()
+            DashboardCounter.objects.bulk_create(
+                [DashboardCounter(key=key, value=value) for key, (_, value) in drift.items() if value],
+                batch_size=BATCH_SIZE,
+            )
+    return {key: values for key, values in drift.items() if values[0] != values[1]}
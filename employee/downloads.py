@@ -0,0 +1,105 @@
+import os
+import re
+
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 64 * 1024
+
+
+def file_etag(stat):
+    """A strong validator for a file that only ever changes by being replaced."""
+    return quote_etag(f'{stat.st_size:x}-{stat.st_mtime_ns:x}')
+
+
+def parse_byte_range(header, size):
+    """
+    The inclusive (start, end) of a single `Range: bytes=...` header, or None
+    when there is no usable header (multiple ranges are served in full).
+    Raises ValueError when the range lies outside a file of `size` bytes.
+    """
+    match = BYTE_RANGE.match((header or '').strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length or not size:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    """If-Range allows the partial response only while the file is unchanged."""
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def _read(handle, start, length):
+    with handle:
+        handle.seek(start)
+        while length > 0:
+            block = handle.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def serve_file(request, path, filename, content_type):
+    """
+    Send a finished file as an attachment with ETag and Last-Modified, so
+    repeat downloads can be conditional (304), and with single byte-range
+    support (206/416), so interrupted downloads can resume.
+    """
+    try:
+        handle = open(path, 'rb')
+    except OSError:
+        raise Http404("Export file is no longer available.")
+    stat = os.fstat(handle.fileno())
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        handle.close()
+        return _with_validators(response, etag, last_modified)
+
+    try:
+        byte_range = None
+        if _if_range_matches(request, etag, last_modified):
+            byte_range = parse_byte_range(request.META.get('HTTP_RANGE'), stat.st_size)
+    except ValueError:
+        handle.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return _with_validators(response, etag, last_modified)
+
+    if byte_range is None:
+        response = FileResponse(handle, as_attachment=True, filename=filename, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read(handle, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+    return _with_validators(response, etag, last_modified)
+
+
+def _with_validators(response, etag, last_modified):
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,330 @@
+import calendar
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import zlib
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .matrix import LABELS, LETTERS, build_status_matrix, iter_status_matrices
+from .models import Employee, ExportJob
+from .routers import reporting_reads
+from .search import NAME_COLUMNS, filter_employees
+
+# Rows fetched per round-trip when streaming exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Progress is written back to the job every this many employees
+PROGRESS_EVERY = 200
+
+# Largest window of the preview grid served per request
+PREVIEW_MAX_ROWS = 200
+PREVIEW_MAX_DAYS = 92
+
+EXPORT_FILTERS = ('start_date', 'end_date', 'department', 'employee_name', 'month')
+
+# Wide: one row per employee and one column per day, with full status
+# words. Long: one gzipped row per employee-day with a letter code (see
+# matrix.LETTERS), the shape payroll imports expect.
+EXPORT_FORMATS = ('wide', 'long')
+LONG_HEADER = ['employee_id', 'email', 'date', 'status_code']
+
+
+class Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def export_params(query):
+    """The non-empty export filters from a QueryDict or dict, plus a non-default format."""
+    params = {key: query.get(key) for key in EXPORT_FILTERS if query.get(key)}
+    if export_format(query) != EXPORT_FORMATS[0]:
+        params['format'] = export_format(query)
+    return params
+
+
+def export_format(params):
+    return params.get('format') if params.get('format') in EXPORT_FORMATS else EXPORT_FORMATS[0]
+
+
+def resolve_export_range(params):
+    """
+    Date range for an export: a month of the current year, an explicit
+    start/end pair, or the current month to date. Raises ValueError when
+    the end date is earlier than the start date.
+    """
+    month = params.get('month')
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+
+    if month:
+        month = int(month)
+        year = date.today().year
+        return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+    if start_date and end_date:
+        start_date = date.fromisoformat(start_date)
+        end_date = date.fromisoformat(end_date)
+        if end_date < start_date:
+            raise ValueError("End date cannot be earlier than start date.")
+        return start_date, end_date
+    return date.today().replace(day=1), date.today()
+
+
+def export_employees(params):
+    employees = Employee.objects.all().order_by('id')
+    dept_id = params.get('department')  # department name
+    employee_name = params.get('employee_name')
+    if dept_id:
+        employees = employees.filter(department=dept_id)
+    if employee_name:
+        employees = filter_employees(employees, employee_name, NAME_COLUMNS)
+    return employees
+
+
+def iter_export_rows(employees, start_date, end_date):
+    """Yield the header and one row per employee, built from status matrices a chunk at a time."""
+    num_days = (end_date - start_date).days + 1
+    yield ["Employee Name"] + [(start_date + timedelta(days=i)).strftime("%d %b %Y") for i in range(num_days)]
+
+    for matrix in iter_status_matrices(employees, start_date, end_date, chunk_size=EXPORT_CHUNK_SIZE):
+        for name, statuses in matrix.rows():
+            yield [name] + statuses
+
+
+def iter_long_chunks(employees, start_date, end_date):
+    """
+    Yield (employee count, rows) per chunk of employees, where rows are
+    (employee_id, email, date, status_code) for every employee-day that
+    has a status.
+    """
+    for matrix in iter_status_matrices(employees, start_date, end_date, chunk_size=EXPORT_CHUNK_SIZE):
+        ids = [pk for pk, _ in matrix.employees]
+        emails = dict(Employee.objects.filter(pk__in=ids).values_list('id', 'email'))
+        rows, cols = np.nonzero(matrix.codes)
+        yield len(matrix), zip(
+            np.array(ids)[rows].tolist(),
+            np.array([emails.get(pk, '') for pk in ids], dtype=object)[rows].tolist(),
+            np.array([day.isoformat() for day in matrix.days], dtype=object)[cols].tolist(),
+            LETTERS[matrix.codes[rows, cols]].tolist(),
+        )
+
+
+def iter_long_gzip(employees, start_date, end_date):
+    """
+    The long export as gzipped CSV bytes, for streaming straight to the
+    client: each chunk of employees is compressed as it is produced.
+    """
+    # wbits 16 + 15: a gzip container, as write_long_export's file has
+    compressor = zlib.compressobj(wbits=31)
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+    writer.writerow(LONG_HEADER)
+    for _, rows in iter_long_chunks(employees, start_date, end_date):
+        writer.writerows(rows)
+        data = compressor.compress(buffer.getvalue().encode('utf-8'))
+        buffer.seek(0)
+        buffer.truncate()
+        if data:
+            yield data
+    yield compressor.compress(buffer.getvalue().encode('utf-8')) + compressor.flush()
+
+
+def preview_window(employees, start_date, end_date, row_offset, row_count, day_offset, day_count):
+    """
+    One rectangle of the export preview: row_count employees from row_offset
+    and day_count days from day_offset into the range, clipped to its
+    bounds. Cells are sent as status codes, one digit per day, with the
+    legend giving each code's text, so only the visible part of a large
+    range is ever computed or transferred.
+    """
+    num_days = (end_date - start_date).days + 1
+    row_offset = max(0, row_offset)
+    row_count = max(0, min(row_count, PREVIEW_MAX_ROWS))
+    day_offset = max(0, min(day_offset, num_days))
+    day_count = max(0, min(day_count, PREVIEW_MAX_DAYS, num_days - day_offset))
+
+    window = {
+        'row_offset': row_offset,
+        'day_offset': day_offset,
+        'days': [],
+        'employees': [],
+        'codes': [],
+        'legend': LABELS.tolist(),
+    }
+    if not row_count or not day_count:
+        return window
+
+    first_day = start_date + timedelta(days=day_offset)
+    last_day = first_day + timedelta(days=day_count - 1)
+    rows = list(
+        employees.values_list('id', 'first_name', 'last_name', 'date_hired')[row_offset:row_offset + row_count]
+    )
+    matrix = build_status_matrix(rows, first_day, last_day)
+    window['days'] = [day.isoformat() for day in matrix.days]
+    window['employees'] = [[pk, name] for pk, name in matrix.employees]
+    window['codes'] = matrix.code_strings()
+    return window
+
+
+def export_job_key(params):
+    """Identify a filter combination; month and default ranges are resolved first."""
+    start_date, end_date = resolve_export_range(params)
+    key = {
+        'format': export_format(params),
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'department': params.get('department', ''),
+        'employee_name': params.get('employee_name', ''),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def enqueue_export_job(params, user=None):
+    """
+    Queue an export for these filters, or return a job that already covers
+    them: one still queued, one started within EXPORT_JOB_STALE_SECONDS, or
+    one finished within EXPORT_JOB_REUSE_SECONDS whose file is still on
+    disk. A job running for longer is marked failed, since its worker most
+    likely died, and a new one is queued in its place.
+    """
+    key = export_job_key(params)
+    now = timezone.now()
+    reuse_after = now - timedelta(seconds=settings.EXPORT_JOB_REUSE_SECONDS)
+    stale_before = now - timedelta(seconds=settings.EXPORT_JOB_STALE_SECONDS)
+
+    for job in ExportJob.objects.filter(params_key=key).exclude(status='Failed').order_by('-created_at')[:5]:
+        if job.status == 'Pending':
+            return job
+        if job.status == 'Running':
+            if job.started_at and job.started_at < stale_before:
+                fail_stale_export_job(job, now)
+                continue
+            return job
+        if job.finished_at and job.finished_at >= reuse_after and os.path.exists(job.file_path):
+            return job
+
+    return ExportJob.objects.create(requested_by=user, params=params, params_key=key)
+
+
+def fail_stale_export_job(job, now):
+    # Only if it is still running: the worker may have finished meanwhile
+    ExportJob.objects.filter(pk=job.pk, status='Running').update(
+        status='Failed', error='The export worker stopped before finishing.', finished_at=now
+    )
+
+
+def remove_old_export_files():
+    """
+    Delete files under EXPORT_ROOT older than EXPORT_JOB_REUSE_SECONDS that
+    no reusable finished job points to, and partial files left behind by
+    workers that died. Returns the number of files removed.
+    """
+    if not os.path.isdir(settings.EXPORT_ROOT):
+        return 0
+    now = timezone.now()
+    reuse_after = now - timedelta(seconds=settings.EXPORT_JOB_REUSE_SECONDS)
+    keep = {
+        os.path.abspath(path)
+        for path in ExportJob.objects.filter(status='Done', finished_at__gte=reuse_after).values_list(
+            'file_path', flat=True
+        )
+    }
+    removed = 0
+    for entry in os.scandir(settings.EXPORT_ROOT):
+        if not entry.is_file() or os.path.abspath(entry.path) in keep:
+            continue
+        age = now.timestamp() - entry.stat().st_mtime
+        # A running job keeps touching its .part file as it writes
+        limit = settings.EXPORT_JOB_STALE_SECONDS if entry.name.endswith('.part') else settings.EXPORT_JOB_REUSE_SECONDS
+        if age > limit:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+    return removed
+
+
+def claim_next_export_job():
+    """Mark the oldest pending job as running and return it, or None."""
+    while True:
+        job = ExportJob.objects.filter(status='Pending').order_by('created_at').first()
+        if job is None:
+            return None
+        # Another worker may claim the same job between the two queries
+        claimed = ExportJob.objects.filter(pk=job.pk, status='Pending').update(
+            status='Running', started_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def write_wide_export(path, employees, start_date, end_date, progress):
+    done = 0
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.writer(handle)
+        rows = iter_export_rows(employees, start_date, end_date)
+        writer.writerow(next(rows))
+        for row in rows:
+            writer.writerow(row)
+            done += 1
+            if done % PROGRESS_EVERY == 0:
+                progress(done)
+    return done
+
+
+def write_long_export(path, employees, start_date, end_date, progress):
+    """Stream the long export through gzip; progress counts employees, not lines."""
+    done = 0
+    with gzip.open(path, 'wt', newline='', encoding='utf-8') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(LONG_HEADER)
+        for count, rows in iter_long_chunks(employees, start_date, end_date):
+            writer.writerows(rows)
+            done += count
+            progress(done)
+    return done
+
+
+def export_file_name(params):
+    return 'attendance_long.csv.gz' if export_format(params) == 'long' else 'employee_data.csv'
+
+
+def run_export_job(job):
+    """Write the job's export file under EXPORT_ROOT, recording progress as it goes."""
+    try:
+        start_date, end_date = resolve_export_range(job.params)
+        employees = export_employees(job.params)
+        ExportJob.objects.filter(pk=job.pk).update(rows_total=employees.count(), rows_done=0)
+
+        os.makedirs(settings.EXPORT_ROOT, exist_ok=True)
+        extension = '.csv.gz' if export_format(job.params) == 'long' else '.csv'
+        path = os.path.join(settings.EXPORT_ROOT, f"export-{job.pk}{extension}")
+        partial = path + ".part"
+
+        def progress(done):
+            ExportJob.objects.filter(pk=job.pk).update(rows_done=done)
+
+        write = write_long_export if export_format(job.params) == 'long' else write_wide_export
+        with reporting_reads():
+            done = write(partial, employees, start_date, end_date, progress)
+        os.replace(partial, path)
+
+        ExportJob.objects.filter(pk=job.pk).update(
+            status='Done', rows_done=done, file_path=path, finished_at=timezone.now()
+        )
+    except Exception as exc:
+        ExportJob.objects.filter(pk=job.pk).update(
+            status='Failed', error=str(exc), finished_at=timezone.now()
+        )
+    job.refresh_from_db()
+    return job
@@ -2,7 +2,8 @@ from django import forms
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import User
 
-from .models import Employee, LeaveRequest
+from .logins import clear_login_failures, login_blocked, record_login_failure, username_for_email
+from .models import Attendance, Employee, LeaveRequest
 
 
 class LoginForm(AuthenticationForm):
@@ -15,22 +16,40 @@ class LoginForm(AuthenticationForm):
         widget=forms.PasswordInput(attrs={"class": "form-control"})
     )
 
+    error_messages = {
+        **AuthenticationForm.error_messages,
+        "too_many_attempts": "Too many failed login attempts. Please try again later.",
+    }
+
     def clean_username(self):
         username = self.cleaned_data.get('username')
-        if username:
-            # Check if input looks like an email
-            if '@' in username:
-                try:
-                    # Try to find user by email
-                    user = User.objects.get(email=username)
-                    return user.username
-                except User.DoesNotExist:
-                    # If email not found, return original input (will fail authentication)
-                    return username
-            # If not an email, treat as username
-            return username
+        # Inputs that look like an email sign in with the matching account;
+        # unknown emails fall through and fail authentication as typed
+        if username and '@' in username:
+            return username_for_email(username) or username
         return username
 
+    def client_ip(self):
+        return self.request.META.get('REMOTE_ADDR', '') if self.request else ''
+
+    def clean(self):
+        username = self.cleaned_data.get('username')
+        ip = self.client_ip()
+        if username and login_blocked(username, ip):
+            # Refused before authenticate(), so no password is hashed
+            raise forms.ValidationError(
+                self.error_messages["too_many_attempts"], code="too_many_attempts"
+            )
+        try:
+            cleaned_data = super().clean()
+        except forms.ValidationError as error:
+            if username and error.code == "invalid_login":
+                record_login_failure(username, ip)
+            raise
+        if username:
+            clear_login_failures(username, ip)
+        return cleaned_data
+
 
 class RegistrationForm(forms.ModelForm):
     password = forms.CharField(
@@ -106,3 +125,131 @@ class LeaveRequestForm(forms.ModelForm):
         }
 
 
+class BulkAttendanceForm(forms.Form):
+    start_date = forms.DateField(widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}))
+    end_date = forms.DateField(
+        required=False,
+        help_text="Leave blank to mark a single day",
+        widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+    )
+    department = forms.ChoiceField(required=False, widget=forms.Select(attrs={"class": "form-control"}))
+    status = forms.ChoiceField(
+        choices=Attendance._meta.get_field("status").choices,
+        initial="Present",
+        widget=forms.Select(attrs={"class": "form-control"}),
+    )
+    overwrite = forms.BooleanField(
+        required=False,
+        initial=True,
+        label="Overwrite existing records",
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
+    # "<employee id>:<status>" per line, filled in by the page's script so a
+    # roll-call of thousands stays under DATA_UPLOAD_MAX_NUMBER_FIELDS
+    overrides = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def __init__(self, *args, departments=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["department"].choices = [("", "All departments")] + [(d, d) for d in departments]
+
+    def clean_overrides(self):
+        statuses = dict(Attendance._meta.get_field("status").choices)
+        overrides = {}
+        for line in self.cleaned_data["overrides"].split():
+            employee_id, _, status = line.partition(":")
+            if not employee_id.isdigit() or status not in statuses:
+                raise forms.ValidationError(f"Invalid status override: {line}")
+            overrides[int(employee_id)] = status
+        return overrides
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get("start_date")
+        end_date = cleaned_data.get("end_date")
+        if start_date and end_date and end_date < start_date:
+            raise forms.ValidationError("End date cannot be earlier than start date.")
+        if start_date and not end_date:
+            cleaned_data["end_date"] = start_date
+        return cleaned_data
+
+
+class AttendanceImportForm(forms.Form):
+    file = forms.FileField(
+        label="Attendance log (CSV)",
+        help_text="Columns: email or employee_id, date or timestamp, and optionally status.",
+        widget=forms.ClearableFileInput(attrs={"class": "form-control-file", "accept": ".csv"}),
+    )
+
+
+class EmployeeOnboardingForm(forms.Form):
+    file = forms.FileField(
+        label="New hires (CSV)",
+        help_text=(
+            "Columns: first_name, last_name, email, position, department, date_hired (YYYY-MM-DD), "
+            "and optionally username and password."
+        ),
+        widget=forms.ClearableFileInput(attrs={"class": "form-control-file", "accept": ".csv"}),
+    )
+
+
+class ListFilterForm(forms.Form):
+    """GET filters shared by the paginated employee and leave lists."""
+    department = forms.ChoiceField(required=False, widget=forms.Select(attrs={"class": "form-control form-control-sm mr-2"}))
+    date_from = forms.DateField(
+        required=False,
+        label="From",
+        widget=forms.DateInput(attrs={"class": "form-control form-control-sm mr-2", "type": "date"}),
+    )
+    date_to = forms.DateField(
+        required=False,
+        label="To",
+        widget=forms.DateInput(attrs={"class": "form-control form-control-sm mr-2", "type": "date"}),
+    )
+
+    def __init__(self, *args, departments=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if departments is None:
+            del self.fields["department"]
+        else:
+            self.fields["department"].choices = [("", "All departments")] + [(d, d) for d in departments]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get("date_from")
+        date_to = cleaned_data.get("date_to")
+        if date_from and date_to and date_to < date_from:
+            raise forms.ValidationError("End date cannot be earlier than start date.")
+        return cleaned_data
+
+
+class EmployeeFilterForm(ListFilterForm):
+    field_order = ["q"]
+
+    q = forms.CharField(
+        required=False,
+        label="Search",
+        widget=forms.TextInput(attrs={
+            "class": "form-control form-control-sm mr-2",
+            "placeholder": "Name, email, position…",
+        }),
+    )
+    min_attendance = forms.FloatField(
+        required=False,
+        min_value=0,
+        max_value=100,
+        label="Min. attendance %",
+        widget=forms.NumberInput(attrs={"class": "form-control form-control-sm mr-2", "step": "0.01"}),
+    )
+
+
+class LeaveFilterForm(ListFilterForm):
+    status = forms.ChoiceField(
+        required=False,
+        choices=[("", "Any status")] + LeaveRequest._meta.get_field("status").choices,
+        widget=forms.Select(attrs={"class": "form-control form-control-sm mr-2"}),
+    )
+
+    def __init__(self, *args, with_status=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not with_status:
+            del self.fields["status"]
@@ -0,0 +1,40 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+
+# Spawned workers unpickle _hash_passwords by importing this module before
+# _setup_worker has run, so nothing here may import models.
+
+# Below this many passwords, starting worker processes costs more than it saves
+POOL_THRESHOLD = 16
+
+
+def _setup_worker():
+    # Spawned workers start without Django configured
+    import django
+
+    django.setup()
+
+
+def _hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    make_password() for each password, spread over `workers` processes
+    (default: one per CPU). PBKDF2 holds the GIL, so threads would not help.
+    Workers are spawned rather than forked: a fork from a threaded web
+    server can copy a lock some other thread holds and hang the child.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < POOL_THRESHOLD:
+        return _hash_passwords(passwords)
+    # A few chunks per worker keeps them all busy to the end
+    size = max(1, len(passwords) // (workers * 4))
+    chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_setup_worker) as pool:
+        return [encoded for chunk in pool.map(_hash_passwords, chunks) for encoded in chunk]
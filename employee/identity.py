@@ -0,0 +1,69 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db.models import Exists, OuterRef
+
+from .models import Employee
+
+# Employee columns fetched alongside the user's role in one query
+EMPLOYEE_FIELDS = list(Employee._meta.concrete_fields)
+
+
+class Identity:
+    """What the current user is: HR or not, and their Employee record, if any."""
+
+    def __init__(self, is_hr=False, employee=None):
+        self.is_hr = is_hr
+        self.employee = employee
+
+    @property
+    def is_employee(self):
+        # HR users are employees too
+        return self.is_hr or self.employee is not None
+
+
+def load_identity(user):
+    """Fetch the HR flag and linked Employee for a user with a single query."""
+    if not user.is_authenticated:
+        return Identity()
+
+    hr_membership = User.groups.through.objects.filter(user_id=OuterRef('pk'), group__name='HR')
+    row = (
+        User.objects.filter(pk=user.pk)
+        .annotate(is_hr=Exists(hr_membership))
+        .values_list('is_hr', *[f'employee__{field.name}' for field in EMPLOYEE_FIELDS])
+        .first()
+    )
+    if row is None:
+        return Identity()
+
+    is_hr, values = row[0], row[1:]
+    employee = None
+    if values[0] is not None:
+        employee = Employee.from_db(
+            User.objects.db, [field.attname for field in EMPLOYEE_FIELDS], values
+        )
+        # user.employee and employee.user now resolve without another query
+        Employee.user.field.set_cached_value(employee, user)
+        Employee.user.field.remote_field.set_cached_value(user, employee)
+    return Identity(is_hr=is_hr, employee=employee)
+
+
+def get_identity(user):
+    """
+    The user's Identity, loaded on first use and cached on the user object.
+    request.user is one object per request, so the role decorators, the
+    context processor and the views all share the one lookup through it.
+    """
+    identity = getattr(user, '_identity', None)
+    if identity is None:
+        identity = load_identity(user)
+        user._identity = identity
+    return identity
+
+
+async def aget_identity(user):
+    """get_identity for async views; only goes through a thread when not cached yet."""
+    identity = getattr(user, '_identity', None)
+    if identity is None:
+        identity = await sync_to_async(get_identity)(user)
+    return identity
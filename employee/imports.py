@@ -0,0 +1,163 @@
+import csv
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from django.db import transaction
+
+from .counters import tracking_attendance
+from .models import Attendance, Employee
+from .rollups import rebuild_attendance_rollup
+from .versions import touch
+
+BATCH_SIZE = 1000
+
+STATUSES = {value.lower(): value for value, _ in Attendance._meta.get_field('status').choices}
+
+
+class RejectSample:
+    """csv.writer stand-in that keeps only the first `limit` rows, for showing on a page."""
+
+    def __init__(self, limit=100):
+        self.limit = limit
+        self.rows = []
+
+    def writerow(self, row):
+        if len(self.rows) < self.limit:
+            self.rows.append(row)
+
+
+@contextmanager
+def reject_writer(path=None):
+    """
+    csv.writer for the rejected rows of an import, writing to `path` and
+    closing it on exit; None when no path is given.
+    """
+    if not path:
+        yield None
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        yield csv.writer(handle)
+
+
+def _row_date(row):
+    """The day of a log row, from a `date` column or the date part of a `timestamp`."""
+    value = (row.get('date') or row.get('timestamp') or '').strip()
+    return date.fromisoformat(value[:10])
+
+
+class AttendanceImporter:
+    """
+    Load attendance from a CSV stream in bounded memory.
+
+    Rows need an employee column (`email`, `employee_id` or `employee`,
+    holding either) and a `date` or `timestamp` column; `status` defaults
+    to Present, which suits door-reader clock-in logs. Rows that repeat an
+    employee-day already seen in the current batch or stored in the
+    database are counted as duplicates and skipped. Unusable rows are
+    written to `rejects` (a csv.writer) with a reason.
+    """
+
+    def __init__(self, rejects=None, batch_size=BATCH_SIZE):
+        self.rejects = rejects
+        self.batch_size = batch_size
+        self.by_email = {}
+        self.hired_on = {}
+        for pk, email, hired in Employee.objects.values_list('id', 'email', 'date_hired'):
+            self.by_email[email.lower()] = pk
+            self.hired_on[pk] = hired
+
+        self.stats = {'rows': 0, 'inserted': 0, 'duplicates': 0, 'rejected': 0, 'seconds': 0.0}
+        self.touched = set()
+        self.first_day = None
+        self.last_day = None
+
+    def resolve_employee(self, row):
+        for key in ('email', 'employee_id', 'employee'):
+            value = (row.get(key) or '').strip()
+            if not value:
+                continue
+            if value.isdigit() and int(value) in self.hired_on:
+                return int(value)
+            pk = self.by_email.get(value.lower())
+            if pk is not None:
+                return pk
+        return None
+
+    def reject(self, row, reason):
+        self.stats['rejected'] += 1
+        if self.rejects is not None:
+            self.rejects.writerow(list(row.values()) + [reason])
+
+    def run(self, stream):
+        started = time.monotonic()
+        reader = csv.DictReader(stream)
+        if self.rejects is not None and reader.fieldnames:
+            self.rejects.writerow(reader.fieldnames + ['reason'])
+
+        batch = {}
+        try:
+            for row in reader:
+                self.stats['rows'] += 1
+
+                pk = self.resolve_employee(row)
+                if pk is None:
+                    self.reject(row, 'unknown employee')
+                    continue
+                try:
+                    day = _row_date(row)
+                except ValueError:
+                    self.reject(row, 'invalid date')
+                    continue
+                status = STATUSES.get((row.get('status') or 'Present').strip().lower())
+                if status is None:
+                    self.reject(row, 'invalid status')
+                    continue
+                if day < self.hired_on[pk]:
+                    self.reject(row, 'before hire date')
+                    continue
+
+                if (pk, day) in batch:
+                    self.stats['duplicates'] += 1
+                    continue
+                batch[(pk, day)] = status
+                if len(batch) >= self.batch_size:
+                    self.flush(batch)
+                    batch = {}
+            self.flush(batch)
+        finally:
+            # Bulk writes skip the model signals, so refresh the rollup here
+            if self.touched:
+                rebuild_attendance_rollup(
+                    Employee.objects.filter(pk__in=self.touched), self.first_day, self.last_day
+                )
+            self.stats['seconds'] = time.monotonic() - started
+        return self.stats
+
+    def flush(self, batch):
+        if not batch:
+            return
+        days = [day for _, day in batch]
+        first_day, last_day = min(days), max(days)
+        existing = set(
+            Attendance.objects.filter(
+                employee_id__in={pk for pk, _ in batch},
+                date__range=(first_day, last_day),
+            ).values_list('employee_id', 'date')
+        )
+        records = [
+            Attendance(employee_id=pk, date=day, status=status)
+            for (pk, day), status in batch.items()
+            if (pk, day) not in existing
+        ]
+        with transaction.atomic(), tracking_attendance({pk for pk, _ in batch}, first_day, last_day):
+            Attendance.objects.bulk_create(records, batch_size=500, ignore_conflicts=True)
+            if records:
+                touch(Attendance)
+
+        self.stats['inserted'] += len(records)
+        self.stats['duplicates'] += len(batch) - len(records)
+        self.touched.update(record.employee_id for record in records)
+        if records:
+            self.first_day = min(first_day, self.first_day or first_day)
+            self.last_day = max(last_day, self.last_day or last_day)
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.db import transaction
+
+from .counters import bump, count_pending_by_employee, tracking_attendance
+from .models import Attendance, Employee, LeaveRequest
+from .rollups import rebuild_attendance_rollup
+from .versions import touch
+from .workdays import get_working_calendar
+
+BATCH_SIZE = 500
+
+# Sortable columns of the leave lists, see pagination.parse_sort
+LEAVE_SORTS = {
+    'employee': ('employee__last_name', 'employee__first_name'),
+    'start_date': ('start_date',),
+    'end_date': ('end_date',),
+    'status': ('status',),
+}
+
+
+def filter_leave_requests(leaves, filters):
+    """Apply cleaned LeaveFilterForm data; the date range keeps leave that overlaps it."""
+    if filters.get('department'):
+        leaves = leaves.filter(employee__department=filters['department'])
+    if filters.get('status'):
+        leaves = leaves.filter(status=filters['status'])
+    if filters.get('date_from'):
+        leaves = leaves.filter(end_date__gte=filters['date_from'])
+    if filters.get('date_to'):
+        leaves = leaves.filter(start_date__lte=filters['date_to'])
+    return leaves
+
+
+def approve_leave_requests(leaves):
+    """
+    Approve leave requests and mark their working days as Leave.
+
+    Statuses are updated with one UPDATE and the attendance rows are
+    written with a single bulk upsert per batch, all in one transaction.
+    Weekends and holidays inside the leave range are left untouched.
+    Returns the number of requests approved.
+    """
+    leaves = list(leaves.only('id', 'employee_id', 'start_date', 'end_date'))
+    if not leaves:
+        return 0
+
+    first_day = min(leave.start_date for leave in leaves)
+    last_day = max(leave.end_date for leave in leaves)
+    calendar = get_working_calendar(first_day, max(first_day, last_day))
+
+    records = {}
+    for leave in leaves:
+        current = leave.start_date
+        while current <= leave.end_date:
+            if calendar.is_working_day(current):
+                records[(leave.employee_id, current)] = Attendance(
+                    employee_id=leave.employee_id, date=current, status='Leave'
+                )
+            current += timedelta(days=1)
+
+    employee_ids = {leave.employee_id for leave in leaves}
+    with transaction.atomic():
+        approved = LeaveRequest.objects.filter(pk__in=[leave.pk for leave in leaves])
+        pending = count_pending_by_employee(approved)
+        approved.update(status='Approved')
+        with tracking_attendance(employee_ids, first_day, last_day):
+            Attendance.objects.bulk_create(
+                records.values(),
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['employee', 'date'],
+                update_fields=['status'],
+            )
+        # Bulk writes skip the model signals, so refresh the rollup, counters and data versions here
+        bump(pending)
+        touch(Attendance, LeaveRequest)
+        rebuild_attendance_rollup(Employee.objects.filter(pk__in=employee_ids), first_day, last_day)
+    return len(leaves)
+
+
+def reject_leave_requests(leaves):
+    """Reject leave requests with a single UPDATE; returns the number rejected."""
+    with transaction.atomic():
+        pending = count_pending_by_employee(leaves)
+        rejected = leaves.update(status='Rejected')
+        bump(pending)
+        touch(LeaveRequest)
+    return rejected
@@ -0,0 +1,52 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.functions import Lower
+
+
+def username_for_email(email):
+    """
+    The username registered under `email`, compared case-insensitively, or
+    None. LOWER(email) is what auth_user_email_lower_idx indexes, so this is
+    an index lookup rather than a scan of auth_user.
+    """
+    return (
+        User.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower=email.strip().lower())
+        .order_by('pk')
+        .values_list('username', flat=True)
+        .first()
+    )
+
+
+def _failure_key(username, ip):
+    # Per address, so failures from elsewhere cannot lock the account's owner out
+    digest = hashlib.sha256(f'{username.strip().lower()}\n{ip}'.encode()).hexdigest()
+    return f'login-failures:{digest}'
+
+
+def login_blocked(username, ip):
+    """
+    Whether `username` has failed LOGIN_FAILURE_LIMIT times from the client
+    address `ip` within the window. Blocked attempts are refused before the
+    password is hashed.
+    """
+    limit = settings.LOGIN_FAILURE_LIMIT
+    return bool(limit) and cache.get(_failure_key(username, ip), 0) >= limit
+
+
+def record_login_failure(username, ip):
+    key = _failure_key(username, ip)
+    # The window starts at the first failure and is not extended by later ones
+    if not cache.add(key, 1, settings.LOGIN_FAILURE_WINDOW):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.add(key, 1, settings.LOGIN_FAILURE_WINDOW)
+
+
+def clear_login_failures(username, ip):
+    cache.delete(_failure_key(username, ip))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employee.imports import reject_writer
+
+
+class CsvImportCommand(BaseCommand):
+    """
+    Base for the commands that load a CSV: opens the file, writes rejected
+    rows to --reject-file, and prints summary(stats) for the dict run()
+    returns. A ValueError from run(), such as missing columns, is reported
+    as a CommandError.
+    """
+
+    path_help = "CSV file to import."
+    batch_size = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help=self.path_help)
+        parser.add_argument(
+            "--reject-file",
+            help="Write rejected rows here, with the reason in a last column.",
+        )
+        parser.add_argument("--batch-size", type=int, default=self.batch_size)
+
+    def run(self, source, rejects, options):
+        raise NotImplementedError
+
+    def summary(self, stats):
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        try:
+            source = open(options["path"], newline="", encoding="utf-8-sig")
+        except OSError as exc:
+            raise CommandError(f"Cannot open {options['path']}: {exc}")
+
+        with source, reject_writer(options["reject_file"]) as rejects:
+            try:
+                stats = self.run(source, rejects, options)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(self.summary(stats)))
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from employee.models import Employee
+
+from .bench_views import Command as BenchViewsCommand
+
+# The async views; every other page is served the same way under both handlers
+VIEWS = ("hr_dashboard", "dashboard", "my_attendance", "my_leave_requests")
+
+
+class Command(BenchViewsCommand):
+    help = (
+        "Compare requests per second of the async dashboard and self-service views "
+        "through Django's ASGI handler, with --concurrency requests in flight, "
+        "against the WSGI handler serving them one at a time, all in one process "
+        "(one worker). Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per view and handler.")
+        parser.add_argument("--concurrency", type=int, default=10, help="ASGI requests in flight at once.")
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--only", action="append", help="Only benchmark this URL name (can be repeated).")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+
+    def run(self, options):
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+        if not Employee.objects.exists():
+            raise CommandError("No employees to benchmark against; run seed_synthetic first.")
+        user = self.bench_user()
+        wsgi = Client(HTTP_HOST=host)
+        wsgi.force_login(user)
+        # AsyncClient always sends Host: testserver on Django 4.2 (an extra
+        # host header is appended, not substituted), so allow that name for
+        # the run, as Django's test environment does
+        asgi = AsyncClient()
+        asgi.force_login(user)
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name in VIEWS:
+                if options["only"] and name not in options["only"]:
+                    continue
+                url = reverse(name)
+                wsgi_rps = self.measure_wsgi(wsgi, url, options)
+                # async_to_sync keeps the ORM on this thread, inside the benchmark transaction
+                asgi_rps = async_to_sync(self.measure_asgi)(asgi, url, options)
+                results[name] = {
+                    "url": url,
+                    "wsgi_rps": round(wsgi_rps, 1),
+                    "asgi_rps": round(asgi_rps, 1),
+                    "speedup": round(asgi_rps / wsgi_rps, 2),
+                }
+
+        return {
+            "meta": {
+                "commit": self.git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "employees": Employee.objects.count(),
+                "database": connection.vendor,
+            },
+            "views": results,
+        }
+
+    def assert_ok(self, response, url):
+        if response.status_code != 200:
+            raise CommandError(f"{url} answered {response.status_code}; expected 200.")
+
+    def measure_wsgi(self, client, url, options):
+        for _ in range(options["warmup"]):
+            self.assert_ok(client.get(url), url)
+        started = time.perf_counter()
+        for _ in range(options["requests"]):
+            client.get(url)
+        return options["requests"] / (time.perf_counter() - started)
+
+    async def measure_asgi(self, client, url, options):
+        for _ in range(options["warmup"]):
+            self.assert_ok(await client.get(url), url)
+        slots = asyncio.Semaphore(options["concurrency"])
+
+        async def fetch():
+            async with slots:
+                await client.get(url)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(fetch() for _ in range(options["requests"])))
+        return options["requests"] / (time.perf_counter() - started)
@@ -0,0 +1,105 @@
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from employee.logins import username_for_email
+
+from .bench_views import Command as BenchViewsCommand
+
+PASSWORD = "bench-login-pass"
+
+
+class Command(BenchViewsCommand):
+    help = (
+        "Measure logins per second on one core: successful email logins through "
+        "the login page, repeated bad passwords with and without the failed-attempt "
+        "limit, and the email lookup through the LOWER(email) index against the "
+        "old exact-match scan. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000, help="Synthetic accounts to add before measuring.")
+        parser.add_argument("--logins", type=int, default=20, help="Successful logins to time.")
+        parser.add_argument("--failures", type=int, default=50, help="Bad-password attempts to time, per mode.")
+        parser.add_argument("--lookups", type=int, default=500, help="Email lookups to time, per query.")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+
+    def run(self, options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+        users = self.bench_users(options["users"])
+        emails = [user.email.upper() for user in users]
+        url = reverse("login")
+
+        return {
+            "meta": {
+                "commit": self.git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "users": User.objects.count(),
+                "failure_limit": settings.LOGIN_FAILURE_LIMIT,
+                "cpu_count": os.cpu_count(),
+                "database": connection.vendor,
+            },
+            "lookup_us": {
+                "lower_email_index": self.time_lookups(username_for_email, emails, options["lookups"]),
+                "exact_email_scan": self.time_lookups(self.scan_lookup, [user.email for user in users], options["lookups"]),
+            },
+            "logins_per_sec": {
+                "email_success": self.time_logins(host, url, emails, PASSWORD, options["logins"], 302),
+                "bad_password_unlimited": self.time_failures(host, url, emails[0], 0, options["failures"]),
+                "bad_password_limited": self.time_failures(
+                    host, url, emails[0], settings.LOGIN_FAILURE_LIMIT, options["failures"]
+                ),
+            },
+        }
+
+    def bench_users(self, count):
+        # One hash shared by every account: hashing each would take minutes
+        password = make_password(PASSWORD)
+        users = [
+            User(username=f"bench-login-{n}", email=f"bench-login-{n}@example.com", password=password)
+            for n in range(count)
+        ]
+        return User.objects.bulk_create(users)
+
+    def scan_lookup(self, email):
+        # The query the login form ran before the index: exact match, no index on email
+        return User.objects.filter(email=email).values_list("username", flat=True).first()
+
+    def time_lookups(self, lookup, emails, count):
+        # Spread over every account; a scan stops early on low primary keys
+        sample = [emails[n * len(emails) // count] for n in range(count)]
+        started = time.perf_counter()
+        for email in sample:
+            if lookup(email) is None:
+                raise CommandError(f"{email} was not found.")
+        return round((time.perf_counter() - started) / count * 1e6, 1)
+
+    def time_logins(self, host, url, emails, password, count, expected):
+        client = Client(HTTP_HOST=host)
+        started = time.perf_counter()
+        for n in range(count):
+            response = client.post(url, {"username": emails[n % len(emails)], "password": password})
+            if response.status_code != expected:
+                raise CommandError(f"Login answered {response.status_code}; expected {expected}.")
+            client.cookies.clear()
+        return round(count / (time.perf_counter() - started), 1)
+
+    def time_failures(self, host, url, email, limit, count):
+        cache.clear()
+        with override_settings(LOGIN_FAILURE_LIMIT=limit):
+            # Use up the allowance first: the rate is for attempts past the limit
+            if limit:
+                self.time_logins(host, url, [email], "wrong-password", limit, 200)
+            rate = self.time_logins(host, url, [email], "wrong-password", count, 200)
+        cache.clear()
+        return rate
@@ -0,0 +1,191 @@
+import json
+import subprocess
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from employee import urls as employee_urls
+from employee.models import Employee, ExportJob, LeaveRequest
+
+# logout would end the benchmark session, leave_approval_action only takes
+# POST on a view whose GET is the list page, and export_job_download needs a
+# finished export file on disk
+SKIP = {"logout", "leave_approval_action", "export_job_download"}
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every GET-able URL in employee/urls.py through the test client and "
+        "report latency percentiles, SQL query counts and peak memory as JSON. "
+        "Runs inside a transaction that is rolled back, so nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--range-days", type=int, default=30, help="Date range used for the export pages.")
+        parser.add_argument("--only", action="append", help="Only benchmark this URL name (can be repeated).")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            report = self.run(options)
+            transaction.set_rollback(True)
+
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(payload + "\n")
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(payload)
+
+    def run(self, options):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost")
+        # Pick samples before the benchmark user exists so it is never chosen
+        samples = self.samples(options)
+        client.force_login(self.bench_user())
+
+        results = {}
+        for pattern in employee_urls.urlpatterns:
+            name = pattern.name
+            if not name or name in SKIP or name in results:
+                continue
+            if options["only"] and name not in options["only"]:
+                continue
+            view_class = getattr(pattern.callback, "view_class", None)
+            if view_class is not None and not hasattr(view_class, "get"):
+                continue
+
+            url = self.build_url(name, pattern, samples)
+            results[name] = self.measure(client, url, options)
+
+        return {
+            "meta": {
+                "commit": self.git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "iterations": options["iterations"],
+                "employees": Employee.objects.count(),
+                "database": connection.vendor,
+            },
+            "views": results,
+        }
+
+    def bench_user(self):
+        user = User.objects.create_user(username="bench-hr", email="bench-hr@example.com", password="bench")
+        group, _ = Group.objects.get_or_create(name="HR")
+        user.groups.add(group)
+        Employee.objects.create(
+            user=user,
+            first_name="Bench",
+            last_name="HR",
+            email=user.email,
+            position="HR",
+            department="HR",
+            date_hired=date.today() - timedelta(days=365),
+        )
+        return user
+
+    def samples(self, options):
+        # Oldest employee: the longest history is the worst case for most pages
+        employee = Employee.objects.order_by("date_hired").first()
+        if employee is None:
+            raise CommandError("No employees to benchmark against; run seed_synthetic first.")
+        leave = LeaveRequest.objects.order_by("pk").first()
+        job = ExportJob.objects.create(params={}, params_key="bench")
+        end = date.today()
+        start = end - timedelta(days=options["range_days"] - 1)
+        return {
+            "employee": employee.pk,
+            "leave": leave.pk if leave else employee.pk,
+            "export_job": job.pk,
+            "date": end.isoformat(),
+            "query": f"?start_date={start.isoformat()}&end_date={end.isoformat()}",
+        }
+
+    def build_url(self, name, pattern, samples):
+        kwargs = {}
+        for param in pattern.pattern.converters:
+            if param == "date":
+                kwargs[param] = samples["date"]
+            elif param == "pk" and "leave" in name:
+                kwargs[param] = samples["leave"]
+            elif param == "pk" and name.startswith("export_job"):
+                kwargs[param] = samples["export_job"]
+            else:
+                kwargs[param] = samples["employee"]
+        url = reverse(name, kwargs=kwargs)
+        if name.startswith("export_data"):
+            url += samples["query"]
+        return url
+
+    def fetch(self, client, url):
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def measure(self, client, url, options):
+        for _ in range(options["warmup"]):
+            self.fetch(client, url)
+
+        timings = []
+        queries = []
+        sql_ms = 0.0
+        status = None
+        for _ in range(options["iterations"]):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = self.fetch(client, url)
+                timings.append((time.perf_counter() - started) * 1000)
+            status = response.status_code
+            queries.append(len(ctx.captured_queries))
+            sql_ms += sum(float(query["time"]) for query in ctx.captured_queries) * 1000
+
+        # Memory is traced on a separate pass so it does not skew the timings
+        tracemalloc.start()
+        self.fetch(client, url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        result = {
+            "url": url,
+            "status": status,
+            "latency_ms": {f"p{pct}": round(percentile(timings, pct), 3) for pct in PERCENTILES},
+            "queries": max(queries),
+            "mean_sql_ms": round(sql_ms / max(len(timings), 1), 3),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+        result["latency_ms"]["max"] = round(timings[-1], 3)
+        return result
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
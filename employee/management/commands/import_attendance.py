@@ -0,0 +1,19 @@
+from employee.imports import BATCH_SIZE, AttendanceImporter
+
+from ._csv_import import CsvImportCommand
+
+
+class Command(CsvImportCommand):
+    help = "Import attendance from a CSV log (email/employee_id, date or timestamp, optional status)."
+    batch_size = BATCH_SIZE
+
+    def run(self, source, rejects, options):
+        return AttendanceImporter(rejects=rejects, batch_size=options["batch_size"]).run(source)
+
+    def summary(self, stats):
+        rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0
+        return (
+            f"Read {stats['rows']} rows in {stats['seconds']:.1f}s ({rate:,.0f} rows/s): "
+            f"{stats['inserted']} inserted, {stats['duplicates']} duplicates skipped, "
+            f"{stats['rejected']} rejected."
+        )
@@ -0,0 +1,28 @@
+from employee.onboarding import BATCH_SIZE, DEFAULT_PASSWORD, EmployeeOnboarding
+
+from ._csv_import import CsvImportCommand
+
+
+class Command(CsvImportCommand):
+    help = (
+        "Create employees and user accounts from a CSV of new hires (first_name, last_name, "
+        f"email, position, department, date_hired, optional username and password; "
+        f"the password defaults to {DEFAULT_PASSWORD})."
+    )
+    path_help = "CSV file of new hires."
+    batch_size = BATCH_SIZE
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--workers", type=int, help="Password hashing processes (default: one per CPU).")
+
+    def run(self, source, rejects, options):
+        onboarding = EmployeeOnboarding(rejects=rejects, workers=options["workers"], batch_size=options["batch_size"])
+        return onboarding.run(source)
+
+    def summary(self, stats):
+        return (
+            f"Read {stats['rows']} rows in {stats['seconds']:.1f}s "
+            f"({stats['hash_seconds']:.1f}s hashing passwords): "
+            f"{stats['created']} employees created, {stats['rejected']} rejected."
+        )
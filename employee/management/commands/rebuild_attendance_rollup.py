@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from employee.models import Employee
+from employee.rollups import rebuild_attendance_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly attendance rollup table from raw Attendance rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--employee",
+            type=int,
+            action="append",
+            dest="employee_ids",
+            help="Only rebuild this employee id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        employees = Employee.objects.all()
+        if options["employee_ids"]:
+            employees = employees.filter(pk__in=options["employee_ids"])
+
+        written = rebuild_attendance_rollup(employees)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} monthly summary rows."))
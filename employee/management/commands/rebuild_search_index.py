@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from employee.search import install_search_index, rebuild_search_index, uses_fts
+
+
+class Command(BaseCommand):
+    help = "Recreate the employee full-text search triggers if missing and rebuild the index."
+
+    def handle(self, *args, **options):
+        if not uses_fts():
+            self.stdout.write("The search index is SQLite-only; nothing to do on this database.")
+            return
+        if not install_search_index():
+            rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS("Rebuilt the employee search index."))
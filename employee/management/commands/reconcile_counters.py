@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from employee.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Check the dashboard counters against real row counts and fix any that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it.")
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters(fix=not options["dry_run"])
+        for key, (stored, real) in sorted(drift.items()):
+            self.stdout.write(f"{key}: stored {stored}, actual {real}")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("All counters match."))
+        elif options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} counter(s) out of date."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(drift)} counter(s)."))
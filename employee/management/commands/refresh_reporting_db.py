@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from employee.models import Attendance, Employee, Holiday, LeaveRequest
+from employee.routers import REPORTING, reporting_enabled
+from employee.versions import reporting_lag
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the default SQLite database into the reporting snapshot that exports "
+        "and attendance reports read from. The copy is written beside the snapshot "
+        "and swapped in atomically, so readers never see a partial file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep refreshing every this many seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        if not reporting_enabled():
+            raise CommandError("No reporting database is configured; set EMS_REPORTING_DB to a file path.")
+        if connections[DEFAULT_DB_ALIAS].vendor != "sqlite" or connections[REPORTING].vendor != "sqlite":
+            raise CommandError("The reporting alias is not a SQLite snapshot; a replica is kept current by the database.")
+
+        while True:
+            started = time.monotonic()
+            self.refresh()
+            lag = reporting_lag(Attendance, Employee, Holiday, LeaveRequest)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Reporting snapshot refreshed in {time.monotonic() - started:.2f}s "
+                    f"({sum(lag['behind'].values())} write(s) behind)."
+                )
+            )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
+
+    def refresh(self):
+        primary = connections[DEFAULT_DB_ALIAS]
+        path = str(connections[REPORTING].settings_dict["NAME"])
+        partial = path + ".part"
+
+        primary.ensure_connection()
+        target = sqlite3.connect(partial)
+        try:
+            # Online backup: a consistent copy even while requests keep writing
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        connections[REPORTING].close()
+        os.replace(partial, path)
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from employee.exports import claim_next_export_job, remove_old_export_files, run_export_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued CSV export jobs. Export files nobody can reuse any more "
+        "are deleted at startup and after each job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling for new jobs.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between checks of an empty queue.",
+        )
+
+    def handle(self, *args, **options):
+        self.remove_old_files()
+        while True:
+            job = claim_next_export_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Export {job.pk}: running")
+            job = run_export_job(job)
+            if job.status == "Done":
+                self.stdout.write(self.style.SUCCESS(f"Export {job.pk}: {job.rows_done} rows written to {job.file_path}"))
+            else:
+                self.stderr.write(self.style.ERROR(f"Export {job.pk}: failed - {job.error}"))
+            self.remove_old_files()
+
+    def remove_old_files(self):
+        removed = remove_old_export_files()
+        if removed:
+            self.stdout.write(f"Removed {removed} old export file(s)")
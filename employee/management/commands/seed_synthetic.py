@@ -0,0 +1,149 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from employee.counters import reconcile_counters
+from employee.models import Attendance, Employee, Holiday, LeaveRequest
+from employee.rollups import rebuild_attendance_rollup
+from employee.versions import touch
+from employee.workdays import invalidate_working_calendar
+
+FIRST_NAMES = [
+    "Aarav", "Amelia", "Chen", "Diego", "Emma", "Fatima", "Hiroshi", "Isla", "Jonas", "Kofi",
+    "Leila", "Mateo", "Nadia", "Olga", "Priya", "Rafael", "Sara", "Tariq", "Uma", "Yusuf",
+]
+LAST_NAMES = [
+    "Andersen", "Banerjee", "Costa", "Dubois", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Jensen",
+    "Kowalski", "Lopez", "Mensah", "Nakamura", "Okafor", "Petrov", "Rossi", "Silva", "Tanaka", "Weber",
+]
+DEPARTMENTS = ["Engineering", "Finance", "HR", "Operations", "Sales", "Support"]
+POSITIONS = ["Associate", "Analyst", "Engineer", "Lead", "Manager", "Specialist"]
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = "Generate reproducible synthetic employees, attendance, leave requests and holidays."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=100)
+        parser.add_argument("--years", type=int, default=2, help="Years of history to generate.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--holidays-per-year", type=int, default=10)
+        parser.add_argument("--leaves-per-year", type=int, default=3, help="Leave requests per employee per year.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        today = date.today()
+        first_day = today - timedelta(days=365 * options["years"])
+        started = time.monotonic()
+
+        with transaction.atomic():
+            holidays = self.create_holidays(rng, first_day, today, options)
+            employees = self.create_employees(rng, first_day, today, options)
+            leave_days, leave_count = self.create_leave_requests(rng, employees, today, options)
+            attendance_count = self.create_attendance(rng, employees, holidays, leave_days, today)
+            # New holidays change the working days of existing employees too
+            rebuild_attendance_rollup(None, first_day, today)
+            # Everything above was bulk inserted, past the counter and version signals
+            reconcile_counters()
+            touch(Attendance, Employee, Holiday, LeaveRequest)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(employees)} employees, {attendance_count} attendance rows, "
+                f"{leave_count} leave requests and {len(holidays)} holidays "
+                f"in {time.monotonic() - started:.1f}s (seed {options['seed']})."
+            )
+        )
+
+    def create_holidays(self, rng, first_day, today, options):
+        existing = set(Holiday.objects.values_list("date", flat=True))
+        span = (today - first_day).days
+        wanted = options["holidays_per_year"] * options["years"]
+        new = {}
+        for _ in range(wanted * 5):
+            if len(new) >= wanted:
+                break
+            day = first_day + timedelta(days=rng.randrange(span))
+            if day.weekday() < 5 and day not in existing:
+                new[day] = Holiday(name=f"Synthetic holiday {day:%d %b %Y}", date=day)
+        Holiday.objects.bulk_create(new.values(), ignore_conflicts=True)
+        # bulk_create skips the Holiday signals that normally drop the cache
+        invalidate_working_calendar()
+        return existing | set(new)
+
+    def create_employees(self, rng, first_day, today, options):
+        run = f"synthetic-{options['seed']}-"
+        if Employee.objects.filter(email__startswith=run).exists():
+            raise CommandError(f"Data for seed {options['seed']} already exists; pick another --seed.")
+        span = (today - first_day).days
+        employees = [
+            Employee(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                email=f"{run}{i}@example.com",
+                position=rng.choice(POSITIONS),
+                department=rng.choice(DEPARTMENTS),
+                date_hired=first_day + timedelta(days=rng.randrange(span)),
+            )
+            for i in range(options["employees"])
+        ]
+        Employee.objects.bulk_create(employees, batch_size=BATCH_SIZE)
+        # SQLite and PostgreSQL return primary keys from bulk_create; fall
+        # back to reloading by email where the backend does not.
+        if employees and employees[0].pk is None:
+            employees = list(Employee.objects.filter(email__startswith=run))
+        return employees
+
+    def create_leave_requests(self, rng, employees, today, options):
+        leave_days = set()
+        requests = []
+        for emp in employees:
+            tenure = (today - emp.date_hired).days
+            count = max(0, round(options["leaves_per_year"] * tenure / 365))
+            for _ in range(count):
+                start = emp.date_hired + timedelta(days=rng.randrange(max(tenure, 1)))
+                end = start + timedelta(days=rng.randrange(5))
+                status = rng.choices(["Approved", "Rejected", "Pending"], weights=[7, 2, 1])[0]
+                requests.append(
+                    LeaveRequest(employee=emp, start_date=start, end_date=end, reason="Synthetic leave", status=status)
+                )
+                if status == "Approved":
+                    day = start
+                    while day <= end:
+                        leave_days.add((emp.pk, day))
+                        day += timedelta(days=1)
+        LeaveRequest.objects.bulk_create(requests, batch_size=BATCH_SIZE)
+        return leave_days, len(requests)
+
+    def create_attendance(self, rng, employees, holidays, leave_days, today):
+        total = 0
+        batch = []
+        for emp in employees:
+            day = emp.date_hired
+            while day <= today:
+                if day.weekday() < 5 and day not in holidays:
+                    if (emp.pk, day) in leave_days:
+                        status = "Leave"
+                    else:
+                        roll = rng.random()
+                        if roll < 0.9:
+                            status = "Present"
+                        elif roll < 0.97:
+                            status = "Absent"
+                        else:
+                            # Days with no record at all count as absent too
+                            status = None
+                    if status:
+                        batch.append(Attendance(employee=emp, date=day, status=status))
+                day += timedelta(days=1)
+            if len(batch) >= BATCH_SIZE:
+                Attendance.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+                total += len(batch)
+                batch = []
+        Attendance.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        return total + len(batch)
@@ -0,0 +1,119 @@
+from datetime import date
+
+import numpy as np
+
+from django.db.models import CharField
+from django.db.models.functions import Cast
+
+from .models import Attendance
+from .workdays import get_working_calendar
+
+# Cell codes of a status matrix and the text each one exports as
+BLANK, WEEKEND, HOLIDAY, ABSENT, PRESENT, LEAVE = range(6)
+LABELS = np.array(['', '-', 'Holiday', 'Absent', 'Present', 'Leave'], dtype=object)
+STATUS_CODES = {'Absent': ABSENT, 'Present': PRESENT, 'Leave': LEAVE}
+# Single-letter codes for the long export, where blank cells are left out
+LETTERS = np.array(['', 'W', 'H', 'A', 'P', 'L'], dtype=object)
+
+
+class StatusMatrix:
+    """
+    Employees x days grid of status codes for an export range.
+
+    `employees` holds (id, name) pairs in row order and `codes` is a uint8
+    array with one row per employee and one column per day.
+    """
+
+    def __init__(self, employees, days, codes):
+        self.employees = employees
+        self.days = days
+        self.codes = codes
+
+    def __len__(self):
+        return len(self.employees)
+
+    def labels(self):
+        """The cells as export text, an object array shaped like codes."""
+        return LABELS[self.codes]
+
+    def code_strings(self):
+        """Each row's codes as text with one digit per day, a compact wire format."""
+        return [row.tobytes().decode('ascii') for row in self.codes + ord('0')]
+
+    def rows(self):
+        """(employee name, [cell text per day]) for every employee, in order."""
+        for (_, name), row in zip(self.employees, self.labels().tolist()):
+            yield name, row
+
+
+def day_ordinals(start_date, end_date):
+    return np.arange(start_date.toordinal(), end_date.toordinal() + 1, dtype=np.int64)
+
+
+def build_status_matrix(employees, start_date, end_date, today=None, holidays=None):
+    """
+    Classify every employee-day between start_date and end_date.
+
+    employees is a sequence of (id, first_name, last_name, date_hired)
+    tuples. Attendance is read with one query; the masks are applied from
+    lowest to highest precedence so each overrides the ones before it:
+    recorded status (Absent when missing), weekends, holidays, days after
+    today that are not holidays, and days before the employee was hired.
+    """
+    today = today or date.today()
+    if holidays is None:
+        holidays = get_working_calendar(start_date, end_date).holidays
+    ordinals = day_ordinals(start_date, end_date)
+    days = [date.fromordinal(int(ordinal)) for ordinal in ordinals]
+
+    ids = np.fromiter((emp[0] for emp in employees), dtype=np.int64, count=len(employees))
+    hired = np.fromiter((emp[3].toordinal() for emp in employees), dtype=np.int64, count=len(employees))
+    codes = np.full((len(employees), len(days)), ABSENT, dtype=np.uint8)
+
+    if len(employees):
+        # Dates come back as ISO text so numpy can convert whole columns at
+        # once instead of Django parsing every record
+        records = list(
+            Attendance.objects.filter(employee_id__in=ids.tolist(), date__range=(start_date, end_date))
+            .annotate(day=Cast('date', CharField()))
+            .values_list('employee_id', 'day', 'status')
+        )
+        if records:
+            employee_ids, dates, statuses = zip(*records)
+            order = np.argsort(ids)
+            rows = order[np.searchsorted(ids, np.array(employee_ids, dtype=np.int64), sorter=order)]
+            cols = (np.array(dates, dtype='datetime64[D]') - np.datetime64(start_date, 'D')).astype(np.int64)
+            statuses = np.array(statuses, dtype=str)
+            values = np.full(len(records), ABSENT, dtype=np.uint8)
+            for status, code in STATUS_CODES.items():
+                values[statuses == status] = code
+            codes[rows, cols] = values
+
+    # date.toordinal() is 1 for Monday 1 January of year 1
+    weekend = (ordinals - 1) % 7 >= 5
+    holiday = np.isin(ordinals, np.fromiter((day.toordinal() for day in holidays), dtype=np.int64))
+    codes[:, weekend] = WEEKEND
+    codes[:, holiday] = HOLIDAY
+    codes[:, (ordinals > today.toordinal()) & ~holiday] = BLANK
+    codes[ordinals[np.newaxis, :] < hired[:, np.newaxis]] = BLANK
+
+    names = [(emp[0], f"{emp[1]} {emp[2]}") for emp in employees]
+    return StatusMatrix(names, days, codes)
+
+
+def iter_status_matrices(employees, start_date, end_date, chunk_size=2000):
+    """
+    build_status_matrix over an Employee queryset, one matrix per chunk of
+    chunk_size employees so memory stays bounded on company-wide exports.
+    """
+    today = date.today()
+    holidays = get_working_calendar(start_date, end_date).holidays
+    chunk = []
+    rows = employees.values_list('id', 'first_name', 'last_name', 'date_hired').iterator(chunk_size=chunk_size)
+    for employee in rows:
+        chunk.append(employee)
+        if len(chunk) == chunk_size:
+            yield build_status_matrix(chunk, start_date, end_date, today, holidays)
+            chunk = []
+    if chunk:
+        yield build_status_matrix(chunk, start_date, end_date, today, holidays)
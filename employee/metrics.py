@@ -0,0 +1,157 @@
+import time
+from collections import deque
+from threading import Lock
+
+from django.conf import settings
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class QueryTimer:
+    """
+    connection.execute_wrapper hook that counts the queries of one request
+    and keeps the ones slower than `slow_ms` for the sample log.
+    """
+
+    def __init__(self, slow_ms):
+        self.slow_ms = slow_ms
+        self.count = 0
+        self.seconds = 0.0
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            if elapsed * 1000 >= self.slow_ms:
+                self.slow.append((sql, elapsed * 1000))
+
+
+class ViewStats:
+    __slots__ = ("requests", "errors", "buckets", "latency_ms", "queries", "sql_ms", "max_latency_ms")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_ms = 0.0
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.max_latency_ms = 0.0
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms_total": round(self.latency_ms, 3),
+            "latency_ms_mean": round(self.latency_ms / self.requests, 3) if self.requests else 0,
+            "latency_ms_max": round(self.max_latency_ms, 3),
+            "histogram": dict(zip([str(bound) for bound in LATENCY_BUCKETS_MS] + ["+Inf"], self.buckets)),
+            "queries": self.queries,
+            "queries_mean": round(self.queries / self.requests, 2) if self.requests else 0,
+            "sql_ms_total": round(self.sql_ms, 3),
+        }
+
+
+class MetricsRegistry:
+    """
+    Per-process request metrics: totals and a latency histogram per URL
+    name, plus bounded logs of the most recent requests and slow queries.
+    """
+
+    def __init__(self, recent_size=1000, slow_size=100):
+        self.lock = Lock()
+        self.views = {}
+        self.recent = deque(maxlen=recent_size)
+        self.slow_queries = deque(maxlen=slow_size)
+        self.started = time.time()
+
+    def record(self, view, status, latency_ms, timer):
+        sql_ms = timer.seconds * 1000
+        bucket = len(LATENCY_BUCKETS_MS)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                bucket = index
+                break
+        now = time.time()
+
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = ViewStats()
+            stats.requests += 1
+            stats.errors += status >= 500
+            stats.buckets[bucket] += 1
+            stats.latency_ms += latency_ms
+            stats.max_latency_ms = max(stats.max_latency_ms, latency_ms)
+            stats.queries += timer.count
+            stats.sql_ms += sql_ms
+
+            self.recent.append(
+                {
+                    "view": view,
+                    "status": status,
+                    "at": now,
+                    "latency_ms": round(latency_ms, 3),
+                    "queries": timer.count,
+                    "sql_ms": round(sql_ms, 3),
+                }
+            )
+            for sql, elapsed_ms in timer.slow:
+                self.slow_queries.append({"view": view, "at": now, "ms": round(elapsed_ms, 3), "sql": sql[:1000]})
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+            self.recent.clear()
+            self.slow_queries.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "since": self.started,
+                "views": {view: stats.as_dict() for view, stats in sorted(self.views.items())},
+                "recent": list(self.recent),
+                "slow_queries": list(self.slow_queries),
+            }
+
+    def prometheus(self):
+        """Render the per-view totals in the Prometheus text exposition format."""
+        lines = [
+            "# HELP ems_view_latency_ms Request latency per view in milliseconds.",
+            "# TYPE ems_view_latency_ms histogram",
+        ]
+        with self.lock:
+            views = sorted(self.views.items())
+            for view, stats in views:
+                cumulative = 0
+                for bound, count in zip(list(LATENCY_BUCKETS_MS) + ["+Inf"], stats.buckets):
+                    cumulative += count
+                    lines.append(f'ems_view_latency_ms_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+                lines.append(f'ems_view_latency_ms_sum{{view="{view}"}} {stats.latency_ms:.3f}')
+                lines.append(f'ems_view_latency_ms_count{{view="{view}"}} {stats.requests}')
+
+            for metric, help_text, attr in (
+                ("ems_view_errors_total", "Responses with a 5xx status.", "errors"),
+                ("ems_view_sql_queries_total", "SQL queries run while handling the view.", "queries"),
+                ("ems_view_sql_ms_total", "Time spent in SQL while handling the view, in milliseconds.", "sql_ms"),
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for view, stats in views:
+                    value = getattr(stats, attr)
+                    value = f"{value:.3f}" if isinstance(value, float) else value
+                    lines.append(f'{metric}{{view="{view}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(
+    recent_size=getattr(settings, "VIEW_METRICS_RECENT_SIZE", 1000),
+    slow_size=getattr(settings, "VIEW_METRICS_SLOW_QUERY_SIZE", 100),
+)
@@ -0,0 +1,78 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import QueryTimer, registry
+from .routers import pin_to_default, reporting_enabled
+
+
+class ViewMetricsMiddleware:
+    """
+    Record latency and SQL work per URL name into employee.metrics.registry.
+
+    Opt-in with settings.VIEW_METRICS_ENABLED; when it is off Django drops
+    the middleware at startup and requests pay nothing. SQL run while a
+    streaming response is consumed happens after this returns and is not
+    counted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "VIEW_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "VIEW_METRICS_SLOW_QUERY_MS", 100)
+
+    def __call__(self, request):
+        timer = QueryTimer(self.slow_ms)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            # Every alias: reports and exports read from the reporting one
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        view = (match.view_name if match else None) or "<unresolved>"
+        registry.record(view, response.status_code, latency_ms, timer)
+        return response
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful write request, pin the session's reporting views to
+    default until the reporting copy has the write (see employee.routers),
+    so a redirect to a report never shows data from before it. Dropped at
+    startup when no reporting database is configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not reporting_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def wrote(self, request, response):
+        return request.method not in ("GET", "HEAD", "OPTIONS", "TRACE") and response.status_code < 400
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.wrote(request, response):
+            pin_to_default(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.wrote(request, response):
+            await sync_to_async(pin_to_default)(request)
+        return response
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:32
+
+from calendar import monthrange
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def backfill_rollup(apps, schema_editor):
+    """
+    Summarise the attendance already on file, as rebuild_attendance_rollup()
+    would, so percentages read from the rollup are right straight after
+    migrating. Uses the historical models so later model changes cannot
+    break it.
+    """
+    alias = schema_editor.connection.alias
+    Attendance = apps.get_model('employee', 'Attendance')
+    AttendanceMonthlySummary = apps.get_model('employee', 'AttendanceMonthlySummary')
+    Employee = apps.get_model('employee', 'Employee')
+    Holiday = apps.get_model('employee', 'Holiday')
+
+    holidays = set(Holiday.objects.using(alias).values_list('date', flat=True))
+    hired_on = dict(Employee.objects.using(alias).values_list('id', 'date_hired'))
+    rows = (
+        Attendance.objects.using(alias)
+        .filter(date__gte=F('employee__date_hired'), date__week_day__in=(2, 3, 4, 5, 6))
+        .exclude(date__in=Holiday.objects.using(alias).values('date'))
+        .annotate(month=TruncMonth('date'))
+        .values('employee_id', 'month', 'status')
+        .annotate(total=Count('id'))
+    )
+    counts = {}
+    for row in rows:
+        counts.setdefault((row['employee_id'], row['month']), {})[row['status']] = row['total']
+
+    def working_days(first_day, last_day):
+        days = (first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1))
+        return sum(1 for day in days if day.weekday() < 5 and day not in holidays)
+
+    summaries = []
+    for (pk, month), status_counts in counts.items():
+        month_end = month.replace(day=monthrange(month.year, month.month)[1])
+        summaries.append(
+            AttendanceMonthlySummary(
+                employee_id=pk,
+                month=month,
+                present=status_counts.get('Present', 0),
+                leave=status_counts.get('Leave', 0),
+                absent=status_counts.get('Absent', 0),
+                working_days=working_days(max(month, hired_on[pk]), month_end),
+            )
+        )
+    AttendanceMonthlySummary.objects.using(alias).bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0005_employee_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('leave', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('working_days', models.PositiveIntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='employee.employee')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='attendancemonthlysummary',
+            constraint=models.UniqueConstraint(fields=('employee', 'month'), name='unique_attendance_summary_per_month'),
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# The FTS5 index and its triggers as they are at this migration; later
+# changes to employee.search must not alter what this migration creates.
+CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS employee_search USING fts5("
+    "first_name, last_name, email, position, department, "
+    "content='employee_employee', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+)
+CREATE_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS employee_search_ai AFTER INSERT ON employee_employee BEGIN "
+    "INSERT INTO employee_search(rowid, first_name, last_name, email, position, department) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email, new.position, new.department); END",
+    "CREATE TRIGGER IF NOT EXISTS employee_search_ad AFTER DELETE ON employee_employee BEGIN "
+    "INSERT INTO employee_search(employee_search, rowid, first_name, last_name, email, position, department) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.position, old.department); END",
+    "CREATE TRIGGER IF NOT EXISTS employee_search_au AFTER UPDATE ON employee_employee BEGIN "
+    "INSERT INTO employee_search(employee_search, rowid, first_name, last_name, email, position, department) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.position, old.department); "
+    "INSERT INTO employee_search(rowid, first_name, last_name, email, position, department) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email, new.position, new.department); END",
+)
+REBUILD = "INSERT INTO employee_search(employee_search) VALUES ('rebuild')"
+DROP = (
+    "DROP TRIGGER IF EXISTS employee_search_ai",
+    "DROP TRIGGER IF EXISTS employee_search_ad",
+    "DROP TRIGGER IF EXISTS employee_search_au",
+    "DROP TABLE IF EXISTS employee_search",
+)
+
+
+def install(apps, schema_editor):
+    # FTS5 is SQLite only; other backends search with icontains
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in (CREATE_TABLE, *CREATE_TRIGGERS, REBUILD):
+        schema_editor.execute(statement, params=None)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP:
+        schema_editor.execute(statement, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0008_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:51
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_existing_rows(apps, schema_editor):
+    """
+    Start every counter at the real count of the rows already stored, as
+    employee.counters.real_counts() does, with the historical models and
+    the key formats as they are at this migration.
+    """
+    alias = schema_editor.connection.alias
+    Attendance = apps.get_model('employee', 'Attendance')
+    DashboardCounter = apps.get_model('employee', 'DashboardCounter')
+    Employee = apps.get_model('employee', 'Employee')
+    LeaveRequest = apps.get_model('employee', 'LeaveRequest')
+
+    attendance = Attendance.objects.using(alias)
+    counts = Counter()
+    counts['employees'] = Employee.objects.using(alias).count()
+    counts['attendance'] = attendance.count()
+    for row in attendance.values('employee_id').annotate(n=Count('id')).order_by():
+        counts[f"employee:{row['employee_id']}:attendance"] = row['n']
+    for row in attendance.values('date', 'status').annotate(n=Count('id')).order_by():
+        counts[f"day:{row['date'].isoformat()}:{row['status']}"] += row['n']
+    leaves = (
+        LeaveRequest.objects.using(alias)
+        .values('employee_id')
+        .annotate(total=Count('id'), pending=Count('id', filter=Q(status='Pending')))
+        .order_by()
+    )
+    for row in leaves:
+        counts[f"employee:{row['employee_id']}:leave_requests"] = row['total']
+        counts[f"employee:{row['employee_id']}:leave_pending"] = row['pending']
+        counts['leave_requests'] += row['total']
+        counts['leave_pending'] += row['pending']
+
+    DashboardCounter.objects.using(alias).bulk_create(
+        [DashboardCounter(key=key, value=value) for key, value in counts.items() if value],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0009_employee_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_existing_rows, migrations.RunPython.noop),
+    ]
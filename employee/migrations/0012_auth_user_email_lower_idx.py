@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    auth_user belongs to django.contrib.auth, so its email index is created
+    here. The expression matches the LOWER(email) lookup in
+    employee.logins.username_for_email.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('employee', '0011_dataversion'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_email_lower_idx ON auth_user (LOWER(email))',
+            'DROP INDEX auth_user_email_lower_idx',
+        ),
+    ]
@@ -12,6 +12,10 @@ class Employee(models.Model):
 
     class Meta:
        ordering = ['-date_hired']
+       indexes = [
+           models.Index(fields=['date_hired'], name='employee_hired_idx'),
+           models.Index(fields=['department', 'date_hired'], name='employee_dept_hired_idx'),
+       ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -36,6 +40,14 @@ class LeaveRequest(models.Model):
     reason = models.TextField()
     status = models.CharField(max_length=10, choices=[('Pending', 'Pending'), ('Approved', 'Approved'), ('Rejected', 'Rejected')], default='Pending')
 
+    class Meta:
+        # Keyset pagination of the leave lists seeks on these
+        indexes = [
+            models.Index(fields=['start_date'], name='leave_start_idx'),
+            models.Index(fields=['status', 'start_date'], name='leave_status_start_idx'),
+            models.Index(fields=['employee', 'start_date'], name='leave_employee_start_idx'),
+        ]
+
     def __str__(self):
         return f"{self.employee.first_name} {self.employee.last_name} - {self.start_date} to {self.end_date} - {self.status}"
     
@@ -46,3 +58,72 @@ class Holiday(models.Model):
     def __str__(self):
         return f"{self.name} - {self.date}"
 
+
+class AttendanceMonthlySummary(models.Model):
+    """Per-employee, per-month attendance counts over working days."""
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
+    month = models.DateField()  # first day of the month
+    present = models.PositiveIntegerField(default=0)
+    leave = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)  # recorded Absent rows only
+    working_days = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'month'], name='unique_attendance_summary_per_month')
+        ]
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.month:%Y-%m}"
+
+
+class ExportJob(models.Model):
+    """A queued CSV export, built by the run_export_worker command."""
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('Running', 'Running'),
+        ('Done', 'Done'),
+        ('Failed', 'Failed'),
+    ]
+
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    params = models.JSONField(default=dict)
+    params_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Pending')
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_done = models.PositiveIntegerField(default=0)
+    file_path = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Export {self.pk} - {self.status}"
+
+    @property
+    def progress(self):
+        if self.status == 'Done':
+            return 100
+        if not self.rows_total:
+            return 0
+        return round(self.rows_done * 100 / self.rows_total)
+
+
+class DashboardCounter(models.Model):
+    """A maintained total read by the dashboards instead of COUNT(*), see employee.counters."""
+    key = models.CharField(max_length=64, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class DataVersion(models.Model):
+    """Write watermark of one table, bumped on every change, see employee.versions."""
+    table = models.CharField(max_length=64, unique=True)
+    version = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
@@ -0,0 +1,147 @@
+import csv
+import time
+
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.text import slugify
+
+from .counters import EMPLOYEES, bump
+from .hashing import hash_passwords
+from .models import Employee
+from .versions import touch
+
+# What CreateEmployeeView gives a new hire when HR does not set one
+DEFAULT_PASSWORD = 'changeme123'
+
+REQUIRED_COLUMNS = ('first_name', 'last_name', 'email', 'position', 'department', 'date_hired')
+
+BATCH_SIZE = 1000
+
+class EmployeeOnboarding:
+    """
+    Create employees and their user accounts from a CSV of new hires.
+
+    Rows need first_name, last_name, email, position, department and
+    date_hired (YYYY-MM-DD) columns, and may carry a `username` and a
+    `password` (default DEFAULT_PASSWORD). Missing usernames are made from
+    the name as CreateEmployeeView does, with a number appended when taken.
+    Rows whose email is already used, by an account or earlier in the file,
+    or whose explicit username is taken, are written to `rejects` (a
+    csv.writer) with a reason. Collisions are checked against usernames and
+    emails loaded once up front, passwords are hashed in a process pool, and
+    everything is inserted with bulk_create in one transaction.
+    """
+
+    def __init__(self, rejects=None, workers=None, batch_size=BATCH_SIZE):
+        self.rejects = rejects
+        self.workers = workers
+        self.batch_size = batch_size
+        self.usernames = set(User.objects.values_list('username', flat=True))
+        self.suffixes = {}
+        self.emails = {email.lower() for email in Employee.objects.values_list('email', flat=True)}
+        self.emails.update(email.lower() for email in User.objects.exclude(email='').values_list('email', flat=True))
+        self.stats = {'rows': 0, 'created': 0, 'rejected': 0, 'hash_seconds': 0.0, 'seconds': 0.0}
+
+    def reject(self, row, reason):
+        self.stats['rejected'] += 1
+        if self.rejects is not None:
+            self.rejects.writerow(list(row.values()) + [reason])
+
+    def clean_row(self, row):
+        """The row's Employee field values, or raise ValidationError."""
+        values = {}
+        for name in REQUIRED_COLUMNS:
+            # Field.clean() checks type, length and format, not uniqueness
+            values[name] = Employee._meta.get_field(name).clean((row.get(name) or '').strip(), None)
+        return values
+
+    def claim_username(self, row, values):
+        username = (row.get('username') or '').strip()
+        if username:
+            User._meta.get_field('username').clean(username, None)
+            if username in self.usernames:
+                raise ValidationError('username already taken')
+        else:
+            base = slugify(f"{values['first_name']}.{values['last_name']}") or 'employee'
+            username, suffix = base, self.suffixes.get(base, 1)
+            while username in self.usernames:
+                suffix += 1
+                username = f'{base}{suffix}'
+            # Resume from here for the next hire with the same name
+            self.suffixes[base] = suffix
+        self.usernames.add(username)
+        return username
+
+    def run(self, stream):
+        started = time.monotonic()
+        reader = csv.DictReader(stream)
+        missing = [name for name in REQUIRED_COLUMNS if name not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}.")
+        if self.rejects is not None:
+            self.rejects.writerow(reader.fieldnames + ['reason'])
+
+        hires = []
+        for row in reader:
+            self.stats['rows'] += 1
+            try:
+                values = self.clean_row(row)
+            except ValidationError as exc:
+                self.reject(row, '; '.join(exc.messages))
+                continue
+            email = values['email'].lower()
+            if email in self.emails:
+                self.reject(row, 'email already in use')
+                continue
+            try:
+                username = self.claim_username(row, values)
+            except ValidationError as exc:
+                self.reject(row, '; '.join(exc.messages))
+                continue
+            self.emails.add(email)
+            hires.append((username, row.get('password') or DEFAULT_PASSWORD, values))
+
+        hashing = time.monotonic()
+        passwords = hash_passwords([password for _, password, _ in hires], self.workers)
+        self.stats['hash_seconds'] = time.monotonic() - hashing
+
+        self.create(hires, passwords)
+        self.stats['created'] = len(hires)
+        self.stats['seconds'] = time.monotonic() - started
+        return self.stats
+
+    def create(self, hires, passwords):
+        if not hires:
+            return
+        users = [
+            User(
+                username=username,
+                first_name=values['first_name'],
+                last_name=values['last_name'],
+                email=values['email'],
+                password=password,
+            )
+            for (username, _, values), password in zip(hires, passwords)
+        ]
+        with transaction.atomic():
+            group, _ = Group.objects.get_or_create(name='Employee')
+            User.objects.bulk_create(users, batch_size=self.batch_size)
+            # SQLite and PostgreSQL return primary keys from bulk_create; fall
+            # back to reloading by username where the backend does not.
+            if users[0].pk is None:
+                ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'id'))
+                for user in users:
+                    user.pk = ids[user.username]
+
+            Employee.objects.bulk_create(
+                [Employee(user_id=user.pk, **values) for user, (_, _, values) in zip(users, hires)],
+                batch_size=self.batch_size,
+            )
+            User.groups.through.objects.bulk_create(
+                [User.groups.through(user_id=user.pk, group_id=group.pk) for user in users],
+                batch_size=self.batch_size,
+            )
+            # bulk_create skips the signals that count employees and bump versions
+            bump({EMPLOYEES: len(users)})
+            touch(Employee)
@@ -0,0 +1,191 @@
+import base64
+import binascii
+import json
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """The key values in a cursor, or None if it is missing or malformed."""
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def filter_query(params):
+    """The current GET parameters minus sorting and cursors, for building list links."""
+    query = params.copy()
+    for name in ("sort", "after", "before"):
+        query.pop(name, None)
+    return query.urlencode()
+
+
+def parse_sort(value, sorts, default):
+    """
+    Resolve a `?sort=` value against a view's sortable columns.
+
+    `sorts` maps column names to the model fields they order by; a leading
+    "-" sorts descending. Returns (sort, ordering) where ordering always
+    ends with the primary key so every row has a unique position.
+    """
+    sort = value if (value or "").lstrip("-") in sorts else default
+    descending = sort.startswith("-")
+    prefix = "-" if descending else ""
+    ordering = [prefix + field for field in sorts[sort.lstrip("-")]] + [prefix + "id"]
+    return sort, ordering
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, previous_cursor):
+        self.object_list = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def _after(ordering, values):
+    """Q for rows that sort strictly after `values` under `ordering`."""
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        term = Q(**{f"{name}__{lookup}": values[index]})
+        for earlier, value in zip(ordering[:index], values):
+            term &= Q(**{earlier.lstrip("-"): value})
+        condition |= term
+    return condition
+
+
+def _seek(queryset, ordering, values):
+    """queryset narrowed to rows after `values`, or None for a cursor that does not fit."""
+    if values is None or len(values) != len(ordering):
+        return None
+    try:
+        return queryset.filter(_after(ordering, values))
+    except (ValidationError, ValueError, TypeError):
+        return None
+
+
+def _getters(ordering):
+    return [attrgetter(field.lstrip("-").replace("__", ".")) for field in ordering]
+
+
+def _flip(ordering):
+    return [field[1:] if field.startswith("-") else "-" + field for field in ordering]
+
+
+def keyset_paginate(queryset, ordering, after=None, before=None, page_size=PAGE_SIZE):
+    """
+    Return one page of `queryset` ordered by `ordering`, seeking from a cursor
+    instead of using OFFSET, so the cost of a page does not grow with its
+    depth. `after` and `before` are cursors from a previous page's
+    next_cursor / previous_cursor; pass at most one. Works on model
+    querysets and on .values() querysets alike.
+    """
+    getters = _getters(ordering)
+    names = [field.lstrip("-") for field in ordering]
+
+    def key(obj):
+        if isinstance(obj, dict):
+            # Rows from .values(), which must include every ordering field
+            return [obj[name] for name in names]
+        return [getter(obj) for getter in getters]
+
+    earlier = _seek(queryset, _flip(ordering), decode_cursor(before))
+    if earlier is not None:
+        rows = list(earlier.order_by(*_flip(ordering))[: page_size + 1])
+        more_before = len(rows) > page_size
+        items = rows[:page_size][::-1]
+        return KeysetPage(
+            items,
+            encode_cursor(key(items[-1])) if items else None,
+            encode_cursor(key(items[0])) if items and more_before else None,
+        )
+
+    later = _seek(queryset, ordering, decode_cursor(after))
+    seeking = later is not None
+    rows = list((later if seeking else queryset).order_by(*ordering)[: page_size + 1])
+    items = rows[:page_size]
+    return KeysetPage(
+        items,
+        encode_cursor(key(items[-1])) if len(rows) > page_size else None,
+        encode_cursor(key(items[0])) if items and seeking else None,
+    )
+
+
+def keyset_paginate_list(items, ordering, after=None, before=None, page_size=PAGE_SIZE):
+    """
+    keyset_paginate for rows already in memory, for orderings on values
+    computed in Python (such as an annotated attendance percentage). All
+    fields in `ordering` must sort in the same direction.
+    """
+    getters = _getters(ordering)
+    descending = ordering[0].startswith("-")
+
+    def key(row):
+        # Compare as the cursor stores them: dates as ISO strings
+        values = [getter(row) for getter in getters]
+        return [value.isoformat() if hasattr(value, "isoformat") else value for value in values]
+
+    def past(row, values):
+        return key(row) < values if descending else key(row) > values
+
+    items = sorted(items, key=key, reverse=descending)
+
+    before_values = decode_cursor(before)
+    earlier = None
+    if before_values:
+        try:
+            earlier = [row for row in items if not past(row, before_values) and key(row) != before_values]
+        except TypeError:
+            pass
+    if earlier is not None:
+        page = earlier[-page_size:]
+        return KeysetPage(
+            page,
+            encode_cursor(key(page[-1])) if page else None,
+            encode_cursor(key(page[0])) if len(earlier) > page_size else None,
+        )
+
+    after_values = decode_cursor(after)
+    rest = None
+    if after_values:
+        try:
+            rest = [row for row in items if past(row, after_values)]
+        except TypeError:
+            pass
+    seeking = rest is not None
+    if not seeking:
+        rest = items
+    page = rest[:page_size]
+    return KeysetPage(
+        page,
+        encode_cursor(key(page[-1])) if len(rest) > page_size else None,
+        encode_cursor(key(page[0])) if page and seeking else None,
+    )
@@ -0,0 +1,118 @@
+from calendar import monthrange
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, QuerySet
+from django.db.models.functions import TruncMonth
+
+from .models import Attendance, AttendanceMonthlySummary, Employee, Holiday
+from .workdays import WORKING_WEEK_DAYS, get_working_calendar
+
+BATCH_SIZE = 500
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_end(day):
+    return day.replace(day=monthrange(day.year, day.month)[1])
+
+
+def add_months(month, count):
+    """First day of the month `count` months after (or before) `month`."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def months_between(first_month, last_month):
+    month = first_month
+    while month <= last_month:
+        yield month
+        month = add_months(month, 1)
+
+
+def rebuild_attendance_rollup(employees=None, start_date=None, end_date=None):
+    """
+    Recompute AttendanceMonthlySummary rows from raw Attendance.
+
+    employees defaults to everyone; start_date/end_date limit the rebuild
+    to the months covering that range. A row exists only for months with
+    at least one counted record, so the incremental refreshes and a full
+    rebuild always agree. Returns the number of rows written.
+    """
+    if employees is None:
+        employees = Employee.objects.all()
+    if isinstance(employees, QuerySet):
+        hires = list(employees.values_list('id', 'date_hired'))
+    else:
+        hires = [(emp.pk, emp.date_hired) for emp in employees]
+    if not hires:
+        return 0
+
+    first_month = month_start(start_date) if start_date else None
+    last_month = month_start(end_date) if end_date else None
+
+    written = 0
+    for i in range(0, len(hires), BATCH_SIZE):
+        chunk = hires[i:i + BATCH_SIZE]
+        ids = [pk for pk, _ in chunk]
+
+        records = Attendance.objects.filter(
+            employee_id__in=ids,
+            date__gte=F('employee__date_hired'),
+            date__week_day__in=WORKING_WEEK_DAYS,
+        ).exclude(date__in=Holiday.objects.values('date'))
+        if first_month:
+            records = records.filter(date__gte=first_month)
+        if last_month:
+            records = records.filter(date__lte=month_end(last_month))
+
+        counts = {}
+        rows = (
+            records.annotate(month=TruncMonth('date'))
+            .values('employee_id', 'month', 'status')
+            .annotate(total=Count('id'))
+        )
+        for row in rows:
+            key = (row['employee_id'], row['month'])
+            counts.setdefault(key, {})[row['status']] = row['total']
+
+        summaries = []
+        if counts:
+            hired_on = dict(chunk)
+            months = [month for _, month in counts]
+            calendar = get_working_calendar(min(months), month_end(max(months)))
+            for (pk, month), status_counts in counts.items():
+                summaries.append(
+                    AttendanceMonthlySummary(
+                        employee_id=pk,
+                        month=month,
+                        present=status_counts.get('Present', 0),
+                        leave=status_counts.get('Leave', 0),
+                        absent=status_counts.get('Absent', 0),
+                        working_days=calendar.working_days_between(
+                            max(month, hired_on[pk]), month_end(month)
+                        ),
+                    )
+                )
+
+        stale = AttendanceMonthlySummary.objects.filter(employee_id__in=ids)
+        if first_month:
+            stale = stale.filter(month__gte=first_month)
+        if last_month:
+            stale = stale.filter(month__lte=last_month)
+
+        with transaction.atomic():
+            stale.delete()
+            AttendanceMonthlySummary.objects.bulk_create(summaries, batch_size=BATCH_SIZE)
+        written += len(summaries)
+
+    return written
+
+
+def refresh_attendance_rollup(employee_id, start_date, end_date=None):
+    """Recompute one employee's rollup rows for the months covering a date range."""
+    return rebuild_attendance_rollup(
+        Employee.objects.filter(pk=employee_id), start_date, end_date or start_date
+    )
@@ -0,0 +1,123 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .models import DataVersion
+
+REPORTING = 'reporting'
+
+# Session key holding default's data versions after the user's last write
+PINNED_VERSIONS = '_reporting_pinned_versions'
+
+_reporting = ContextVar('reporting_reads', default=False)
+
+
+def reporting_enabled():
+    return REPORTING in connections.settings
+
+
+@contextmanager
+def reporting_reads():
+    """
+    Send the reads made inside this block to the reporting database, when
+    one is configured. Only for code that reads data it did not just write:
+    the copy can be behind the primary.
+    """
+    token = _reporting.set(True)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+def _data_versions(using):
+    return dict(DataVersion.objects.using(using).values_list('table', 'version'))
+
+
+def pin_to_default(request):
+    """
+    After `request` wrote something: keep this session's reporting views on
+    default until the reporting copy has caught up with the write.
+    """
+    if reporting_enabled() and hasattr(request, 'session'):
+        request.session[PINNED_VERSIONS] = _data_versions(DEFAULT_DB_ALIAS)
+
+
+def reporting_is_behind(request):
+    """Whether the reporting copy lacks writes this session made; clears the pin once it has them."""
+    pinned = getattr(request, 'session', {}).get(PINNED_VERSIONS)
+    if not pinned:
+        return False
+    seen = _data_versions(REPORTING)
+    if any(seen.get(table, 0) < version for table, version in pinned.items()):
+        return True
+    del request.session[PINNED_VERSIONS]
+    return False
+
+
+def reporting_view(view_class):
+    """
+    Class decorator running a view's dispatch inside reporting_reads(),
+    except for sessions whose own writes the reporting copy has not seen
+    yet (see pin_to_default), which keep reading default.
+    """
+    dispatch = view_class.dispatch
+    if view_class.view_is_async:
+        async def reporting_dispatch(self, request, *args, **kwargs):
+            if not reporting_enabled() or await sync_to_async(reporting_is_behind)(request):
+                return await dispatch(self, request, *args, **kwargs)
+            with reporting_reads():
+                return await dispatch(self, request, *args, **kwargs)
+    else:
+        def reporting_dispatch(self, request, *args, **kwargs):
+            if not reporting_enabled() or reporting_is_behind(request):
+                return dispatch(self, request, *args, **kwargs)
+            with reporting_reads():
+                return dispatch(self, request, *args, **kwargs)
+    view_class.dispatch = reporting_dispatch
+    return view_class
+
+
+def iter_from_reporting(iterable):
+    """
+    Consume `iterable` with the routing in effect where this is called, for
+    streaming responses whose queries run after the view has returned:
+    inside reporting_reads() only if the view was.
+    """
+    if not _reporting.get():
+        return iter(iterable)
+    return _iter_reporting(iterable)
+
+
+def _iter_reporting(iterable):
+    with reporting_reads():
+        yield from iterable
+
+
+class ReportingRouter:
+    """
+    Route reads inside reporting_reads() to the `reporting` alias and every
+    write to default. Objects loaded from the reporting copy remember that
+    alias, so writes are pinned to default explicitly.
+    """
+
+    def db_for_read(self, model, **hints):
+        # Inside a transaction on default, reads must see its own writes
+        if _reporting.get() and reporting_enabled() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return REPORTING
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPORTING}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The copy is refreshed from default (or replicated), never migrated
+        return False if db == REPORTING else None
@@ -0,0 +1,152 @@
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Employee
+
+SEARCH_TABLE = 'employee_search'
+SEARCH_COLUMNS = ('first_name', 'last_name', 'email', 'position', 'department')
+NAME_COLUMNS = ('first_name', 'last_name')
+
+# Ranking scores every match; past this many candidates (very common words
+# like a department name) only the first ones by id are ranked, which keeps
+# typeahead lookups fast on large tables.
+RANK_CANDIDATES = 2000
+
+# Matches the unicode61 tokenizer closely enough: runs of letters and digits
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def uses_fts():
+    """The FTS5 index only exists on SQLite; other backends fall back to icontains."""
+    return connection.vendor == 'sqlite'
+
+
+def fts_query(text, columns=None):
+    """
+    Turn free text into an FTS5 MATCH expression: every word must match
+    the start of a token, optionally restricted to `columns`. Returns None
+    when the text has no searchable words.
+    """
+    tokens = TOKEN.findall(text.lower())
+    if not tokens:
+        return None
+    # Quoting each token keeps FTS5 operators (AND, NEAR, ^, ...) literal
+    expression = ' '.join(f'"{token}"*' for token in tokens)
+    if columns:
+        expression = '{%s} : (%s)' % (' '.join(columns), expression)
+    return expression
+
+
+def _icontains(text, columns):
+    condition = Q()
+    for token in TOKEN.findall(text):
+        term = Q()
+        for column in columns:
+            term |= Q(**{f'{column}__icontains': token})
+        condition &= term
+    return condition
+
+
+def filter_employees(queryset, text, columns=SEARCH_COLUMNS):
+    """Narrow an Employee queryset to rows matching `text` (unranked)."""
+    if uses_fts():
+        match = fts_query(text, columns)
+        if match is None:
+            return queryset
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [match])
+        )
+    return queryset.filter(_icontains(text, columns))
+
+
+def search_employees(text, limit=10, columns=SEARCH_COLUMNS):
+    """Employees matching `text`, best match first (bm25, weighting names over the rest)."""
+    if not uses_fts():
+        return list(filter_employees(Employee.objects.all(), text, columns).order_by('last_name', 'first_name')[:limit])
+
+    match = fts_query(text, columns)
+    if match is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM ('
+            f'SELECT rowid, bm25({SEARCH_TABLE}, 10.0, 10.0, 5.0, 1.0, 1.0) AS score '
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s LIMIT %s'
+            f') ORDER BY score LIMIT %s',
+            [match, RANK_CANDIDATES, limit],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    employees = Employee.objects.in_bulk(ids)
+    return [employees[pk] for pk in ids if pk in employees]
+
+
+def rebuild_search_index():
+    """Repopulate the index from the employee table, e.g. after a raw restore."""
+    if uses_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+_FIELDS = ', '.join(SEARCH_COLUMNS)
+_NEW = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+_OLD = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+
+# External-content FTS5 table over employee_employee, kept in step by
+# triggers so bulk_create and queryset.update() are covered as well.
+CREATE_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    f"{_FIELDS}, content='employee_employee', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+)
+CREATE_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON employee_employee BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, {_FIELDS}) VALUES (new.id, {_NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON employee_employee BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {_FIELDS}) VALUES ('delete', old.id, {_OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE ON employee_employee BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {_FIELDS}) VALUES ('delete', old.id, {_OLD}); "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, {_FIELDS}) VALUES (new.id, {_NEW}); END",
+)
+DROP = (
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_au",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+)
+
+
+def install_search_index(using=None, create=True):
+    """
+    Create the index and its triggers if missing, rebuilding the index when
+    any trigger had to be (re)created. SQLite migrations that remake
+    employee_employee drop its triggers, so this also runs after migrate
+    with create=False, which only repairs an index that already exists.
+    """
+    conn = connection if using is None else connections[using]
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        if not create and SEARCH_TABLE not in conn.introspection.table_names(cursor):
+            return False
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f'{SEARCH_TABLE}_a_'],
+        )
+        if cursor.fetchone()[0] == len(CREATE_TRIGGERS):
+            return False
+        cursor.execute(CREATE_TABLE)
+        for statement in CREATE_TRIGGERS:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def drop_search_index(using=None):
+    conn = connection if using is None else connections[using]
+    if conn.vendor == 'sqlite':
+        with conn.cursor() as cursor:
+            for statement in DROP:
+                cursor.execute(statement)
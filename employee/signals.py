@@ -0,0 +1,158 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .counters import (
+    EMPLOYEES,
+    attendance_contribution,
+    bump,
+    diff,
+    employee_contribution,
+    forget_employee,
+    leave_contribution,
+)
+from .models import Attendance, Employee, Holiday, LeaveRequest
+from .rollups import rebuild_attendance_rollup, refresh_attendance_rollup
+from .search import install_search_index
+from .versions import touch
+from .workdays import invalidate_working_calendar
+
+
+def _deleted_directly(model, origin):
+    """False when a delete is cascading from a parent (e.g. an Employee)."""
+    if origin is None:
+        return True
+    return getattr(origin, 'model', type(origin)) is model
+
+
+@receiver(pre_save, sender=Holiday)
+def remember_holiday_date(sender, instance, raw=False, **kwargs):
+    instance._previous_date = None
+    if instance.pk and not raw:
+        instance._previous_date = (
+            Holiday.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def holiday_changed(sender, instance, raw=False, **kwargs):
+    invalidate_working_calendar()
+    if raw:
+        return
+    rebuild_attendance_rollup(start_date=instance.date, end_date=instance.date)
+    previous = getattr(instance, '_previous_date', None)
+    if previous and previous != instance.date:
+        rebuild_attendance_rollup(start_date=previous, end_date=previous)
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_attendance_rollup(instance.employee_id, instance.date)
+        # A row moved to another day or employee leaves its old month behind
+        previous = getattr(instance, '_previous_key', None)
+        if previous and previous != (instance.employee_id, instance.date):
+            refresh_attendance_rollup(*previous)
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(Attendance, origin):
+        refresh_attendance_rollup(instance.employee_id, instance.date)
+
+
+@receiver(post_save, sender=LeaveRequest)
+def leave_request_saved(sender, instance, raw=False, **kwargs):
+    if not raw and instance.status == 'Approved':
+        refresh_attendance_rollup(instance.employee_id, instance.start_date, instance.end_date)
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, created=False, raw=False, **kwargs):
+    # date_hired bounds every month's counts, so rebuild on edits
+    if not created and not raw:
+        rebuild_attendance_rollup([instance])
+
+
+def _contribution(instance):
+    if isinstance(instance, Attendance):
+        return attendance_contribution(instance.employee_id, instance.date, instance.status)
+    return leave_contribution(instance.employee_id, instance.status)
+
+
+@receiver(pre_save, sender=Attendance)
+@receiver(pre_save, sender=LeaveRequest)
+def remember_counted_state(sender, instance, raw=False, **kwargs):
+    # What the stored row adds to the dashboard counters, to diff against after
+    # saving, and for attendance which rollup month it was counted in
+    instance._counted = Counter()
+    instance._previous_key = None
+    if raw or instance._state.adding:
+        return
+    previous = sender.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._counted = _contribution(previous)
+        if sender is Attendance:
+            instance._previous_key = (previous.employee_id, previous.date)
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_save, sender=LeaveRequest)
+def update_counters_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump(diff(getattr(instance, '_counted', Counter()), _contribution(instance)))
+
+
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=LeaveRequest)
+def update_counters_on_delete(sender, instance, origin=None, **kwargs):
+    # Rows deleted along with their employee are taken out by employee_deleted
+    if _deleted_directly(sender, origin):
+        bump(diff(_contribution(instance), {}))
+
+
+@receiver(post_save, sender=Employee)
+def count_new_employee(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        bump({EMPLOYEES: 1})
+
+
+@receiver(pre_delete, sender=Employee)
+def remember_employee_counts(sender, instance, **kwargs):
+    instance._counted = employee_contribution(instance.pk)
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    forget_employee(instance.pk, getattr(instance, '_counted', Counter({EMPLOYEES: 1})))
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_save, sender=Employee)
+@receiver(post_save, sender=Holiday)
+@receiver(post_save, sender=LeaveRequest)
+def touch_on_save(sender, **kwargs):
+    touch(sender)
+
+
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=Holiday)
+@receiver(post_delete, sender=LeaveRequest)
+def touch_on_delete(sender, origin=None, **kwargs):
+    # Rows deleted along with their employee are covered by touch_on_employee_delete
+    if _deleted_directly(sender, origin):
+        touch(sender)
+
+
+@receiver(post_delete, sender=Employee)
+def touch_on_employee_delete(sender, **kwargs):
+    touch(Employee, Attendance, LeaveRequest)
+
+
+@receiver(post_migrate)
+def repair_search_index(sender, using=None, **kwargs):
+    # SQLite migrations that rebuild employee_employee drop the FTS triggers
+    if sender.name == 'employee':
+        install_search_index(using, create=False)
@@ -0,0 +1,1031 @@
+import csv
+import gzip
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .counters import reconcile_counters
+from .exports import enqueue_export_job, remove_old_export_files, run_export_job
+from .hashing import POOL_THRESHOLD
+from .identity import load_identity
+from .imports import AttendanceImporter, RejectSample
+from .metrics import registry
+from .models import Attendance, AttendanceMonthlySummary, Employee, ExportJob, Holiday, LeaveRequest
+from .onboarding import DEFAULT_PASSWORD
+from .pagination import keyset_paginate
+from .rollups import add_months, month_start, rebuild_attendance_rollup
+from .routers import PINNED_VERSIONS, REPORTING, reporting_reads
+from .search import NAME_COLUMNS, filter_employees, fts_query, search_employees
+from .utils import calculate_attendance_stats
+from .versions import touch
+from .workdays import get_working_calendar
+
+STATUSES = ('Present', 'Absent', 'Leave')
+
+
+def day_by_day_percentage(employee, end_date):
+    """The original calculate_attendance_percentage: walk every day since hiring."""
+    record_map = dict(
+        Attendance.objects.filter(employee=employee, date__range=(employee.date_hired, end_date))
+        .values_list('date', 'status')
+    )
+    holidays = set(
+        Holiday.objects.filter(date__range=(employee.date_hired, end_date)).values_list('date', flat=True)
+    )
+    present = absent = 0
+    current = employee.date_hired
+    while current <= end_date:
+        if current.weekday() < 5 and current not in holidays:
+            status = record_map.get(current)
+            if status == 'Present':
+                present += 1
+            elif status != 'Leave':
+                absent += 1
+        current += timedelta(days=1)
+    if present + absent == 0:
+        return 0
+    return round((present / (present + absent)) * 100, 2)
+
+
+def sign_in_hr(client):
+    user = User.objects.create_user('hr', 'hr@example.com', 'pw')
+    user.groups.add(Group.objects.get_or_create(name='HR')[0])
+    client.force_login(user)
+    return user
+
+
+def make_employee(name, hired=date(2024, 1, 1), **fields):
+    values = {
+        'first_name': name,
+        'last_name': 'Test',
+        'email': f'{name.lower()}@example.com',
+        'position': 'Analyst',
+        'department': 'Finance',
+        'date_hired': hired,
+    }
+    return Employee.objects.create(**{**values, **fields})
+
+
+class ReportingDatabaseMixin:
+    """
+    Give the test class a `reporting` alias on default's test database, so
+    the reporting routes run without a second server. For
+    TransactionTestCase: that connection only sees committed rows.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # After the class's database checks are installed, which would block it
+        connections.settings[REPORTING] = dict(connections[DEFAULT_DB_ALIAS].settings_dict)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPORTING].close()
+        del connections[REPORTING]
+        del connections.settings[REPORTING]
+        super().tearDownClass()
+
+
+def rollup_rows():
+    return sorted(
+        AttendanceMonthlySummary.objects.values_list(
+            'employee_id', 'month', 'present', 'leave', 'absent', 'working_days'
+        )
+    )
+
+
+class AttendanceStatsTestCase(TestCase):
+    """Employees with a few months of mixed attendance, weekends and holidays included."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.first_month = add_months(month_start(cls.today), -4)
+        rng = random.Random(7)
+        for offset in (3, 17, 45, 80):
+            Holiday.objects.create(name=f'Holiday {offset}', date=cls.first_month + timedelta(days=offset))
+        cls.employees = [
+            cls.make_employee('start', cls.first_month),
+            # Hired mid-month, and on a weekend day somewhere in the range
+            cls.make_employee('mid', cls.first_month + timedelta(days=40)),
+            cls.make_employee('weekend', cls.next_saturday(cls.first_month + timedelta(days=60))),
+            cls.make_employee('recent', cls.today - timedelta(days=2)),
+            cls.make_employee('future', cls.today + timedelta(days=30)),
+        ]
+        day = cls.first_month - timedelta(days=10)
+        while day <= cls.today:
+            for employee in cls.employees:
+                # Some days before hiring too, which must not count
+                if rng.random() < 0.8:
+                    Attendance.objects.create(employee=employee, date=day, status=rng.choice(STATUSES))
+            day += timedelta(days=1)
+
+    @staticmethod
+    def make_employee(name, hired):
+        return make_employee(name, hired)
+
+    @staticmethod
+    def next_saturday(day):
+        return day + timedelta(days=(5 - day.weekday()) % 7)
+
+    def assertMatchesDayByDay(self):
+        stats = calculate_attendance_stats(Employee.objects.all(), self.today)
+        for employee in Employee.objects.all():
+            self.assertEqual(
+                stats[employee.pk]['percentage'],
+                day_by_day_percentage(employee, self.today),
+                employee.first_name,
+            )
+
+
+class AttendanceRollupTests(AttendanceStatsTestCase):
+    def test_signal_maintained_rollup_matches_day_by_day(self):
+        self.assertTrue(AttendanceMonthlySummary.objects.exists())
+        self.assertMatchesDayByDay()
+
+    def test_rebuild_matches_signal_maintained_rollup(self):
+        maintained = rollup_rows()
+        AttendanceMonthlySummary.objects.all().delete()
+        rebuild_attendance_rollup()
+        self.assertEqual(rollup_rows(), maintained)
+        self.assertMatchesDayByDay()
+
+    def test_edits_in_closed_months_update_rollup(self):
+        record = Attendance.objects.filter(
+            employee=self.employees[0], date__lt=month_start(self.today), date__week_day__in=(2, 3, 4, 5, 6)
+        ).exclude(date__in=Holiday.objects.values('date')).first()
+        record.status = 'Leave' if record.status == 'Present' else 'Present'
+        record.save()
+        Attendance.objects.filter(employee=self.employees[1]).order_by('date').last().delete()
+        self.assertMatchesDayByDay()
+
+    def test_moving_a_record_updates_both_months(self):
+        record = Attendance.objects.filter(
+            employee=self.employees[0],
+            status='Present',
+            date__range=(self.first_month, self.first_month + timedelta(days=20)),
+            date__week_day__in=(2, 3, 4, 5, 6),
+        ).exclude(date__in=Holiday.objects.values('date')).first()
+        # Into a later month, onto a day the other employee has no record for
+        free_day = next(
+            day for day in (self.first_month + timedelta(days=70 + n) for n in range(40))
+            if day.weekday() < 5 and not Attendance.objects.filter(employee=self.employees[1], date=day).exists()
+        )
+        record.employee = self.employees[1]
+        record.date = free_day
+        record.save()
+        self.assertMatchesDayByDay()
+        maintained = rollup_rows()
+        rebuild_attendance_rollup()
+        self.assertEqual(rollup_rows(), maintained)
+
+    def test_holiday_changes_update_rollup(self):
+        Holiday.objects.create(name='New', date=self.first_month + timedelta(days=50))
+        Holiday.objects.order_by('date').first().delete()
+        self.assertMatchesDayByDay()
+
+
+class CounterTests(AttendanceStatsTestCase):
+    def test_signal_maintained_counters_match_real_counts(self):
+        self.assertEqual(reconcile_counters(fix=False), {})
+
+    def test_counters_follow_edits_and_deletes(self):
+        record = Attendance.objects.filter(employee=self.employees[0]).first()
+        record.status = 'Leave' if record.status == 'Present' else 'Present'
+        record.save()
+        leave = LeaveRequest.objects.create(
+            employee=self.employees[1], start_date=self.today, end_date=self.today, reason='Test'
+        )
+        LeaveRequest.objects.create(employee=self.employees[2], start_date=self.today, end_date=self.today, reason='Test')
+        leave.status = 'Approved'
+        leave.save()
+        self.employees[2].delete()
+        Attendance.objects.filter(employee=self.employees[3]).first().delete()
+        self.assertEqual(reconcile_counters(fix=False), {})
+
+
+class AttendanceStatsTests(AttendanceStatsTestCase):
+    def test_matches_day_by_day_for_every_hire_date(self):
+        # start of range, mid-month, on a Saturday, two days ago, next month
+        self.assertMatchesDayByDay()
+
+    def test_matches_day_by_day_for_past_end_dates(self):
+        end_dates = [
+            self.first_month + timedelta(days=44),  # mid-month
+            add_months(self.first_month, 2) - timedelta(days=1),  # last day of a month
+            add_months(self.first_month, 3),  # first day of a month
+        ]
+        employees = list(Employee.objects.all())
+        for end_date in end_dates:
+            stats = calculate_attendance_stats(employees, end_date)
+            for employee in employees:
+                self.assertEqual(
+                    stats[employee.pk]['percentage'],
+                    day_by_day_percentage(employee, end_date),
+                    f'{employee.first_name} to {end_date}',
+                )
+
+    def test_future_hire_counts_nothing(self):
+        stats = calculate_attendance_stats([self.employees[-1]], self.today)
+        self.assertEqual(
+            stats[self.employees[-1].pk], {'present': 0, 'absent': 0, 'leave': 0, 'percentage': 0}
+        )
+
+    def test_weekends_and_holidays_are_skipped(self):
+        monday = self.first_month - timedelta(days=400)
+        monday -= timedelta(days=monday.weekday())
+        employee = self.make_employee('week', monday)
+        Holiday.objects.create(name='Midweek', date=monday + timedelta(days=2))
+        statuses = ['Present', 'Absent', 'Absent', 'Present', 'Leave', 'Absent', 'Absent']
+        for offset, status in enumerate(statuses):
+            Attendance.objects.create(employee=employee, date=monday + timedelta(days=offset), status=status)
+
+        sunday = monday + timedelta(days=6)
+        # Mon, Tue, Thu, Fri count; Wednesday's holiday and the weekend do not
+        self.assertEqual(
+            calculate_attendance_stats([employee], sunday)[employee.pk],
+            {'present': 2, 'absent': 1, 'leave': 1, 'percentage': 66.67},
+        )
+        self.assertEqual(day_by_day_percentage(employee, sunday), 66.67)
+
+
+class TransactionalWriteTests(TestCase):
+    def setUp(self):
+        sign_in_hr(self.client)
+        self.employee = Employee.objects.create(
+            first_name='Ada', last_name='Test', email='ada@example.com',
+            position='Analyst', department='Finance', date_hired=date(2024, 1, 1),
+        )
+        self.record = Attendance.objects.create(employee=self.employee, date=date(2024, 1, 2), status='Absent')
+
+    def test_failed_signal_write_rolls_back_the_row(self):
+        url = f'/hr/attendance/update/{self.employee.pk}/2024-01-02/'
+        # The data-version bump is the last signal write after the UPDATE
+        with mock.patch('employee.signals.touch', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(url, {'status': 'Present'}, HTTP_HOST='localhost')
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.status, 'Absent')
+        self.assertEqual(reconcile_counters(fix=False), {})
+        self.assertEqual(AttendanceMonthlySummary.objects.get().absent, 1)
+
+
+class ExportJobTests(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = root.name
+        override = override_settings(EXPORT_ROOT=self.root, EXPORT_JOB_REUSE_SECONDS=60, EXPORT_JOB_STALE_SECONDS=600)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def make_file(self, name, age):
+        path = os.path.join(self.root, name)
+        with open(path, 'w') as handle:
+            handle.write('x')
+        then = time.time() - age
+        os.utime(path, (then, then))
+        return path
+
+    def test_running_job_is_reused_until_stale(self):
+        job = enqueue_export_job({'month': '1'})
+        ExportJob.objects.filter(pk=job.pk).update(status='Running', started_at=timezone.now())
+        self.assertEqual(enqueue_export_job({'month': '1'}).pk, job.pk)
+
+        ExportJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(seconds=601))
+        requeued = enqueue_export_job({'month': '1'})
+        self.assertNotEqual(requeued.pk, job.pk)
+        self.assertEqual(requeued.status, 'Pending')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'Failed')
+
+    def test_old_unreferenced_files_are_removed(self):
+        reused = self.make_file('export-1.csv', 120)
+        ExportJob.objects.create(params_key='a', status='Done', file_path=reused, finished_at=timezone.now())
+        expired = self.make_file('export-2.csv', 120)
+        ExportJob.objects.create(
+            params_key='b', status='Done', file_path=expired, finished_at=timezone.now() - timedelta(seconds=120)
+        )
+        fresh = self.make_file('export-3.csv', 5)
+        writing = self.make_file('export-4.csv.part', 120)
+        abandoned = self.make_file('export-5.csv.part', 700)
+
+        self.assertEqual(remove_old_export_files(), 2)
+        self.assertEqual(sorted(os.listdir(self.root)), sorted(os.path.basename(p) for p in (reused, fresh, writing)))
+        self.assertFalse(os.path.exists(expired) or os.path.exists(abandoned))
+
+
+class LeaveApprovalTests(TestCase):
+    url = '/hr/leave-approvals/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.monday = date(2024, 3, 4)
+        Holiday.objects.create(name='Midweek', date=cls.monday + timedelta(days=2))
+        cls.ada, cls.bob = make_employee('Ada'), make_employee('Bob')
+        cls.long_leave = LeaveRequest.objects.create(
+            employee=cls.ada, start_date=cls.monday, end_date=cls.monday + timedelta(days=7), reason='Trip'
+        )
+        cls.short_leave = LeaveRequest.objects.create(
+            employee=cls.bob, start_date=cls.monday, end_date=cls.monday + timedelta(days=1), reason='Rest'
+        )
+        cls.decided = LeaveRequest.objects.create(
+            employee=cls.bob, start_date=date(2024, 3, 20), end_date=date(2024, 3, 20), reason='Old', status='Approved'
+        )
+        Attendance.objects.create(employee=cls.ada, date=cls.monday + timedelta(days=1), status='Absent')
+
+    def setUp(self):
+        sign_in_hr(self.client)
+
+    def post(self, action):
+        leave_ids = [self.long_leave.pk, self.short_leave.pk, self.decided.pk]
+        return self.client.post(self.url, {'action': action, 'leave_ids': leave_ids}, HTTP_HOST='localhost')
+
+    def statuses(self):
+        return dict(LeaveRequest.objects.values_list('pk', 'status'))
+
+    def test_batch_approve_marks_working_days_as_leave(self):
+        response = self.post('approve')
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.assertEqual(
+            self.statuses(),
+            {self.long_leave.pk: 'Approved', self.short_leave.pk: 'Approved', self.decided.pk: 'Approved'},
+        )
+        # The Absent day is overwritten; the holiday and the weekend get no row
+        self.assertEqual(
+            sorted(Attendance.objects.values_list('employee_id', 'date', 'status')),
+            sorted(
+                [(self.ada.pk, self.monday + timedelta(days=offset), 'Leave') for offset in (0, 1, 3, 4, 7)]
+                + [(self.bob.pk, self.monday + timedelta(days=offset), 'Leave') for offset in (0, 1)]
+            ),
+        )
+        maintained = rollup_rows()
+        rebuild_attendance_rollup()
+        self.assertEqual(rollup_rows(), maintained)
+        self.assertEqual(reconcile_counters(fix=False), {})
+
+    def test_batch_reject_only_touches_pending_requests(self):
+        self.post('reject')
+        self.assertEqual(
+            self.statuses(),
+            {self.long_leave.pk: 'Rejected', self.short_leave.pk: 'Rejected', self.decided.pk: 'Approved'},
+        )
+        self.assertEqual(Attendance.objects.count(), 1)
+        self.assertEqual(reconcile_counters(fix=False), {})
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Shared hire dates, so the id breaks ties in the ordering
+        for n in range(7):
+            Employee.objects.create(
+                first_name=f'E{n}', last_name='Test', email=f'e{n}@example.com',
+                position='Analyst', department='Finance', date_hired=date(2024, 1, 1 + n // 3),
+            )
+
+    def walk(self, queryset, ordering, key):
+        first = keyset_paginate(queryset, ordering, page_size=3)
+        pages = [first]
+        while pages[-1].next_cursor:
+            pages.append(keyset_paginate(queryset, ordering, after=pages[-1].next_cursor, page_size=3))
+        forward = [key(row) for page in pages for row in page.object_list]
+
+        back = [pages[-1]]
+        while back[-1].previous_cursor:
+            back.append(keyset_paginate(queryset, ordering, before=back[-1].previous_cursor, page_size=3))
+        backward = [key(row) for page in reversed(back) for row in page.object_list]
+        self.assertIsNone(first.previous_cursor)
+        return forward, backward
+
+    def test_forward_and_back_over_model_rows(self):
+        ordering = ['-date_hired', 'id']
+        expected = list(Employee.objects.order_by(*ordering).values_list('pk', flat=True))
+        forward, backward = self.walk(Employee.objects.all(), ordering, lambda row: row.pk)
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected)
+
+    def test_forward_and_back_over_values_rows(self):
+        ordering = ['date_hired', '-id']
+        expected = list(Employee.objects.order_by(*ordering).values_list('pk', flat=True))
+        queryset = Employee.objects.values('id', 'date_hired')
+        forward, backward = self.walk(queryset, ordering, lambda row: row['id'])
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected)
+
+
+class ExportDownloadTests(TestCase):
+    def setUp(self):
+        sign_in_hr(self.client)
+        handle = tempfile.NamedTemporaryFile(delete=False, suffix='.csv')
+        handle.write(b'0123456789')
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        job = ExportJob.objects.create(params_key='k', status='Done', file_path=handle.name, finished_at=timezone.now())
+        self.url = f'/hr/export-data/jobs/{job.pk}/download/'
+
+    def get(self, **headers):
+        return self.client.get(self.url, HTTP_HOST='localhost', **headers)
+
+    def test_full_download(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_byte_ranges(self):
+        for header, body, content_range in [
+            ('bytes=2-4', b'234', 'bytes 2-4/10'),
+            ('bytes=7-', b'789', 'bytes 7-9/10'),
+            ('bytes=-2', b'89', 'bytes 8-9/10'),
+            ('bytes=8-100', b'89', 'bytes 8-9/10'),
+        ]:
+            response = self.get(HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 206, header)
+            self.assertEqual(b''.join(response.streaming_content), body, header)
+            self.assertEqual(response['Content-Range'], content_range, header)
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE='bytes=10-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        response = self.get(HTTP_RANGE='bytes=2-4', HTTP_IF_RANGE='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_requests(self):
+        first = self.get()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+
+@override_settings(LOGIN_FAILURE_LIMIT=3)
+class LoginLockoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        User.objects.create_user('ada', 'Ada@Example.com', 'right-password')
+
+    def login(self, username, password, ip='127.0.0.1'):
+        return self.client.post(
+            '/login/', {'username': username, 'password': password}, HTTP_HOST='localhost', REMOTE_ADDR=ip
+        )
+
+    def test_blocked_after_limit_even_with_right_password(self):
+        for _ in range(3):
+            self.assertEqual(self.login('ada', 'wrong').status_code, 200)
+        response = self.login('ada', 'right-password')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Too many failed login attempts')
+
+    def test_failures_from_another_address_do_not_block(self):
+        for _ in range(3):
+            self.login('ada', 'wrong', ip='203.0.113.9')
+        self.assertContains(self.login('ada', 'right-password', ip='203.0.113.9'), 'Too many failed login attempts')
+        self.assertEqual(self.login('ada', 'right-password').status_code, 302)
+
+    def test_success_clears_failures(self):
+        for _ in range(2):
+            self.login('ada', 'wrong')
+        self.assertEqual(self.login('ada@example.com', 'right-password').status_code, 302)
+        self.client.logout()
+        for _ in range(2):
+            self.login('ada', 'wrong')
+        self.assertEqual(self.login('ada', 'right-password').status_code, 302)
+
+
+class WorkingCalendarCacheTests(TestCase):
+    def test_bulk_created_holiday_is_seen_after_version_bump(self):
+        monday = date(2024, 3, 4)
+        friday = monday + timedelta(days=4)
+        self.assertEqual(get_working_calendar(monday, friday).working_days_between(monday, friday), 5)
+
+        # bulk_create skips the signals that would drop the cache
+        Holiday.objects.bulk_create([Holiday(name='Bulk', date=monday + timedelta(days=2))])
+        self.assertEqual(get_working_calendar(monday, friday).working_days_between(monday, friday), 5)
+        touch(Holiday)
+        self.assertEqual(get_working_calendar(monday, friday).working_days_between(monday, friday), 4)
+
+
+class InlinePool:
+    """Stands in for ProcessPoolExecutor, recording how it was started."""
+
+    started = []
+
+    def __init__(self, max_workers, mp_context, initializer):
+        self.started.append(mp_context.get_start_method())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, function, chunks):
+        return map(function, chunks)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class OnboardUploadTests(TestCase):
+    def test_upload_hashes_in_a_spawned_pool(self):
+        sign_in_hr(self.client)
+        lines = ['first_name,last_name,email,position,department,date_hired']
+        lines += [f'New{n},Hire,new{n}@example.com,Analyst,Finance,2024-01-01' for n in range(POOL_THRESHOLD + 4)]
+        upload = SimpleUploadedFile('hires.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+        InlinePool.started.clear()
+        with mock.patch('employee.hashing.os.cpu_count', return_value=4), \
+                mock.patch('employee.hashing.ProcessPoolExecutor', InlinePool):
+            response = self.client.post('/hr/employees/onboard/', {'file': upload}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        # Forking from a threaded server can deadlock; spawning cannot
+        self.assertEqual(InlinePool.started, ['spawn'])
+        self.assertEqual(Employee.objects.filter(email__startswith='new').count(), POOL_THRESHOLD + 4)
+        user = User.objects.get(email='new0@example.com')
+        self.assertTrue(user.check_password(DEFAULT_PASSWORD))
+        self.assertEqual(reconcile_counters(fix=False), {})
+
+
+class BulkAttendanceTests(TestCase):
+    url = '/hr/attendance/bulk/'
+
+    @classmethod
+    def setUpTestData(cls):
+        # More employees than DATA_UPLOAD_MAX_NUMBER_FIELDS allows fields
+        Employee.objects.bulk_create(
+            Employee(
+                first_name=f'E{n}', last_name='Test', email=f'bulk{n}@example.com',
+                position='Analyst', department='Sales' if n % 2 else 'Finance', date_hired=date(2024, 1, 1),
+            )
+            for n in range(1100)
+        )
+        cls.monday = date(2024, 3, 4)
+
+    def setUp(self):
+        sign_in_hr(self.client)
+
+    def post(self, data):
+        data = {'start_date': self.monday.isoformat(), 'status': 'Present', 'overwrite': 'on', **data}
+        return self.client.post(self.url, data, HTTP_HOST='localhost')
+
+    def test_company_wide_roll_call_with_overrides(self):
+        first, second = Employee.objects.order_by('id').values_list('id', flat=True)[:2]
+        response = self.post({'overrides': f'{first}:Absent\n{second}:Leave'})
+        self.assertRedirects(response, '/hr/attendance/', fetch_redirect_response=False)
+        statuses = Attendance.objects.filter(date=self.monday).values_list('employee_id', 'status')
+        self.assertEqual(len(statuses), 1100)
+        statuses = dict(statuses)
+        self.assertEqual((statuses.pop(first), statuses.pop(second)), ('Absent', 'Leave'))
+        self.assertEqual(set(statuses.values()), {'Present'})
+
+    def test_page_posts_overrides_through_one_field(self):
+        response = self.client.get(self.url, HTTP_HOST='localhost')
+        self.assertContains(response, 'name="overrides"')
+        self.assertContains(response, 'class="form-control form-control-sm status-override"', count=1100)
+
+    def test_per_employee_selects_still_work_without_script(self):
+        employee = Employee.objects.filter(department='Sales').first()
+        self.post({'department': 'Sales', f'status_{employee.pk}': 'Absent'})
+        self.assertEqual(Attendance.objects.filter(date=self.monday).count(), 550)
+        self.assertEqual(Attendance.objects.get(employee=employee, date=self.monday).status, 'Absent')
+
+    def test_existing_rows_kept_without_overwrite(self):
+        employee = Employee.objects.first()
+        Attendance.objects.create(employee=employee, date=self.monday, status='Leave')
+        self.post({'overwrite': ''})
+        self.assertEqual(Attendance.objects.get(employee=employee, date=self.monday).status, 'Leave')
+
+    def test_invalid_override_is_rejected(self):
+        response = self.post({'overrides': '12:Sleeping'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Invalid status override')
+        self.assertFalse(Attendance.objects.exists())
+
+
+class AttendanceImportTests(TestCase):
+    LOG = (
+        'email,timestamp,status\n'
+        'ada@example.com,2024-03-04T08:59:00,\n'
+        'ADA@example.com,2024-03-04T17:30:00,\n'
+        '{bob},2024-03-05,absent\n'
+        'ada@example.com,2024-03-05,Present\n'
+        'ada@example.com,2024-03-04,Leave\n'
+        'nobody@example.com,2024-03-04,\n'
+        'ada@example.com,yesterday,\n'
+        'bob@example.com,2024-03-06,Sleeping\n'
+        'bob@example.com,2023-12-01,\n'
+        'bob@example.com,2024-03-07,Present\n'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada, cls.bob = make_employee('Ada'), make_employee('Bob')
+        Attendance.objects.create(employee=cls.bob, date=date(2024, 3, 7), status='Leave')
+
+    def log(self):
+        return self.LOG.format(bob=self.bob.pk)
+
+    def test_duplicates_are_skipped_within_and_across_batches(self):
+        rejects = RejectSample()
+        # Two rows per batch, so later duplicates are caught against stored rows
+        stats = AttendanceImporter(rejects=rejects, batch_size=2).run(io.StringIO(self.log()))
+        self.assertEqual(
+            {name: stats[name] for name in ('rows', 'inserted', 'duplicates', 'rejected')},
+            {'rows': 10, 'inserted': 3, 'duplicates': 3, 'rejected': 4},
+        )
+        self.assertEqual(
+            sorted(Attendance.objects.values_list('employee_id', 'date', 'status')),
+            [
+                (self.ada.pk, date(2024, 3, 4), 'Present'),
+                (self.ada.pk, date(2024, 3, 5), 'Present'),
+                (self.bob.pk, date(2024, 3, 5), 'Absent'),
+                (self.bob.pk, date(2024, 3, 7), 'Leave'),
+            ],
+        )
+        self.assertEqual(rejects.rows[0], ['email', 'timestamp', 'status', 'reason'])
+        self.assertEqual(
+            [row[-1] for row in rejects.rows[1:]],
+            ['unknown employee', 'invalid date', 'invalid status', 'before hire date'],
+        )
+        maintained = rollup_rows()
+        rebuild_attendance_rollup()
+        self.assertEqual(rollup_rows(), maintained)
+        self.assertEqual(reconcile_counters(fix=False), {})
+
+    def test_command_writes_the_reject_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'log.csv')
+            reject_file = os.path.join(directory, 'rejects.csv')
+            with open(source, 'w', encoding='utf-8') as handle:
+                handle.write(self.log())
+            output = io.StringIO()
+            call_command('import_attendance', source, reject_file=reject_file, stdout=output)
+            with open(reject_file, newline='', encoding='utf-8') as handle:
+                rejected = list(csv.reader(handle))
+        self.assertIn('3 inserted, 3 duplicates skipped, 4 rejected', output.getvalue())
+        self.assertEqual(len(rejected), 5)
+        self.assertEqual(rejected[1], ['nobody@example.com', '2024-03-04', '', 'unknown employee'])
+
+
+@override_settings(VIEW_METRICS_ENABLED=True)
+class ViewMetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        sign_in_hr(self.client)
+
+    def get(self, url, **params):
+        return self.client.get(url, params, HTTP_HOST='localhost')
+
+    def test_requests_are_recorded_per_view(self):
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            self.get('/hr/employees/')
+        # Read before the next request resets the query log
+        per_request = len(queries)
+        self.get('/hr/employees/')
+        stats = self.get('/hr/metrics/').json()['views']['employee_list']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['errors'], 0)
+        self.assertEqual(stats['queries'], 2 * per_request)
+        self.assertEqual(sum(stats['histogram'].values()), 2)
+
+    def test_prometheus_format(self):
+        self.get('/hr/employees/')
+        response = self.get('/hr/metrics/', format='prometheus')
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('ems_view_latency_ms_count{view="employee_list"} 1', body)
+        self.assertIn('ems_view_latency_ms_bucket{view="employee_list",le="+Inf"} 1', body)
+
+    def test_only_hr_can_read_metrics(self):
+        self.client.force_login(User.objects.create_user('someone', 'someone@example.com', 'pw'))
+        self.assertNotEqual(self.get('/hr/metrics/').status_code, 200)
+
+
+@override_settings(VIEW_METRICS_ENABLED=True)
+class ReportingViewMetricsTests(ReportingDatabaseMixin, TransactionTestCase):
+    def test_queries_on_the_reporting_alias_are_counted(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        sign_in_hr(self.client)
+        make_employee('Ada')
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as default, \
+                CaptureQueriesContext(connections[REPORTING]) as reporting:
+            self.client.get('/hr/attendance/', HTTP_HOST='localhost')
+        self.assertTrue(reporting.captured_queries)
+        stats = registry.snapshot()['views']['attendance_summary']
+        self.assertEqual(stats['queries'], len(default) + len(reporting))
+
+
+class ReportingRouterTests(ReportingDatabaseMixin, TransactionTestCase):
+    def test_only_reads_inside_reporting_reads_leave_default(self):
+        self.assertEqual(Employee.objects.all().db, DEFAULT_DB_ALIAS)
+        with reporting_reads():
+            self.assertEqual(Employee.objects.all().db, REPORTING)
+            self.assertEqual(router.db_for_write(Employee), DEFAULT_DB_ALIAS)
+            # A transaction on default reads its own writes
+            with transaction.atomic():
+                self.assertEqual(Employee.objects.all().db, DEFAULT_DB_ALIAS)
+        self.assertFalse(router.allow_migrate(REPORTING, 'employee'))
+
+
+class ReportingSnapshotTests(ReportingDatabaseMixin, TransactionTestCase):
+    """The reporting alias as a snapshot file that only refresh_reporting_db brings up to date."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        connections.settings[REPORTING]['NAME'] = os.path.join(cls.directory, 'reporting.sqlite3')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        self.ada, self.bob = make_employee('Ada'), make_employee('Bob')
+        sign_in_hr(self.client)
+        self.refresh()
+
+    def refresh(self):
+        call_command('refresh_reporting_db', stdout=io.StringIO())
+
+    def summary_names(self, client):
+        response = client.get('/hr/attendance/', HTTP_HOST='localhost')
+        return sorted(row['employee'].first_name for row in response.context['data'])
+
+    def test_writer_reads_default_until_the_snapshot_has_the_write(self):
+        other = Client()
+        colleague = User.objects.create_user('other', 'other@example.com', 'pw')
+        colleague.groups.add(Group.objects.get(name='HR'))
+        other.force_login(colleague)
+        self.client.post(f'/hr/employees/delete/{self.bob.pk}/', HTTP_HOST='localhost')
+        self.assertIn(PINNED_VERSIONS, self.client.session)
+        self.assertEqual(self.summary_names(self.client), ['Ada'])
+        # Sessions without writes read the snapshot, which is still behind
+        self.assertEqual(self.summary_names(other), ['Ada', 'Bob'])
+
+        self.refresh()
+        with CaptureQueriesContext(connections[REPORTING]) as reporting:
+            self.assertEqual(self.summary_names(self.client), ['Ada'])
+        self.assertTrue(reporting.captured_queries)
+        self.assertNotIn(PINNED_VERSIONS, self.client.session)
+
+
+class IdentityTests(TestCase):
+    def get(self, url):
+        with mock.patch('employee.identity.load_identity', wraps=load_identity) as loads:
+            response = self.client.get(url, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        return loads.call_count
+
+    def test_employee_page_loads_identity_once(self):
+        user = User.objects.create_user('ada', 'ada@example.com', 'pw')
+        make_employee('Ada', user=user)
+        self.client.force_login(user)
+        # Role check, get_or_create_employee and the context processor
+        self.assertEqual(self.get('/my-profile/'), 1)
+
+    def test_hr_page_loads_identity_once(self):
+        sign_in_hr(self.client)
+        self.assertEqual(self.get('/hr/employees/'), 1)
+
+
+class ConditionalGetTests(TestCase):
+    url = '/hr/leave/'
+
+    def setUp(self):
+        user = sign_in_hr(self.client)
+        self.async_client.force_login(user)
+        self.employee = make_employee('Ada')
+        LeaveRequest.objects.create(
+            employee=self.employee, start_date=date(2024, 3, 4), end_date=date(2024, 3, 5), reason='Trip'
+        )
+
+    def get(self, **headers):
+        return self.client.get(self.url, HTTP_HOST='localhost', **headers)
+
+    def test_unchanged_page_answers_304(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_a_write_changes_the_etag(self):
+        etag = self.get()['ETag']
+        leave = LeaveRequest.objects.get()
+        leave.status = 'Rejected'
+        leave.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_access_is_checked_before_the_etag(self):
+        etag = self.get()['ETag']
+        self.client.logout()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 302)
+
+    async def test_async_view_answers_304(self):
+        response = await self.async_client.get('/hr/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get('/hr/dashboard/', headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('ada', 'ada@example.com', 'pw')
+        self.employee = make_employee('Ada', user=user)
+        Attendance.objects.create(employee=self.employee, date=date(2024, 1, 2), status='Present')
+        Attendance.objects.create(employee=self.employee, date=date(2024, 1, 3), status='Absent')
+        self.async_client.force_login(user)
+
+    async def test_self_service_pages_render_under_asgi(self):
+        for url in ('/dashboard/', '/my-attendance/', '/my-leave-requests/'):
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+        response = await self.async_client.get('/my-attendance/')
+        self.assertContains(response, 'Ada Test')
+        self.assertEqual(len(response.context['attendance_days']), 2)
+
+    async def test_hr_dashboard_renders_under_asgi(self):
+        await sync_to_async(sign_in_hr)(self.async_client)
+        response = await self.async_client.get('/hr/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_employees'], 1)
+
+
+class EmployeeSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = make_employee('Ada', department='Engineering', position='Engineer')
+        cls.adam = make_employee('Adam', department='Finance')
+        cls.jose = make_employee('José', department='Sales')
+
+    def ids(self, text, **kwargs):
+        return [employee.pk for employee in search_employees(text, **kwargs)]
+
+    def test_prefix_and_every_word_must_match(self):
+        self.assertEqual(set(self.ids('ad')), {self.ada.pk, self.adam.pk})
+        self.assertEqual(self.ids('ad engin'), [self.ada.pk])
+        self.assertEqual(self.ids('!!'), [])
+
+    def test_name_matches_rank_first(self):
+        make_employee('Zed', department='Adam Street Office')
+        self.assertEqual(self.ids('adam')[0], self.adam.pk)
+
+    def test_operators_and_accents_are_literal(self):
+        self.assertEqual(fts_query('NEAR "x'), '"near"* "x"*')
+        self.assertEqual(self.ids('jose'), [self.jose.pk])
+
+    def test_triggers_follow_bulk_create_update_and_delete(self):
+        Employee.objects.bulk_create([Employee(
+            first_name='Bulky', last_name='Test', email='bulky@example.com',
+            position='Analyst', department='Finance', date_hired=date(2024, 1, 1),
+        )])
+        self.assertEqual(len(self.ids('bulky')), 1)
+        Employee.objects.filter(pk=self.ada.pk).update(first_name='Grace')
+        self.assertEqual(self.ids('grace'), [self.ada.pk])
+        # Her email still starts with ada
+        self.assertNotIn(self.ada.pk, self.ids('ada', columns=NAME_COLUMNS))
+        self.adam.delete()
+        self.assertEqual(self.ids('adam'), [])
+
+    def test_filter_restricted_to_name_columns(self):
+        employees = filter_employees(Employee.objects.all(), 'sales', NAME_COLUMNS)
+        self.assertFalse(employees.exists())
+        self.assertEqual(list(filter_employees(Employee.objects.all(), 'sales')), [self.jose])
+
+    def test_typeahead_endpoint(self):
+        sign_in_hr(self.client)
+        response = self.client.get('/hr/employees/search/', {'q': 'ada eng'}, HTTP_HOST='localhost')
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.ada.pk])
+
+
+class ExportFormatTests(TestCase):
+    params = {'start_date': '2024-03-01', 'end_date': '2024-03-10'}
+
+    @classmethod
+    def setUpTestData(cls):
+        for n, status in enumerate(('Present', 'Absent', 'Leave')):
+            employee = make_employee(f'E{n}')
+            Attendance.objects.create(employee=employee, date=date(2024, 3, 4 + n), status=status)
+            Attendance.objects.create(employee=employee, date=date(2024, 3, 8), status='Present')
+
+    def setUp(self):
+        sign_in_hr(self.client)
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        override = override_settings(EXPORT_ROOT=root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def inline(self, **params):
+        response = self.client.get('/hr/export-data/csv/', {**self.params, **params}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def job_file(self, **params):
+        job = run_export_job(ExportJob.objects.create(params={**self.params, **params}, params_key='k'))
+        self.assertEqual(job.status, 'Done', job.error)
+        with open(job.file_path, 'rb') as handle:
+            return handle.read()
+
+    def test_inline_long_export_matches_the_job_file(self):
+        response, body = self.inline(format='long')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('attendance_long.csv.gz', response['Content-Disposition'])
+        text = gzip.decompress(body).decode()
+        self.assertEqual(text, gzip.decompress(self.job_file(format='long')).decode())
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual(rows[0], ['employee_id', 'email', 'date', 'status_code'])
+        # Every employee-day has a code: weekends and unmarked days included
+        self.assertEqual(len(rows), 1 + 3 * 10)
+
+    def test_inline_wide_export_matches_the_job_file(self):
+        response, body = self.inline()
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(body, self.job_file())
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(len(rows), 1 + 3)
+        self.assertEqual(len(rows[0]), 1 + 10)
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('ada', 'ada@example.com', 'pw')
+        cls.ada = make_employee('Ada', user=cls.user)
+        cls.bob = make_employee('Bob', department='Sales')
+        for employee in (cls.ada, cls.bob):
+            Attendance.objects.create(employee=employee, date=date(2024, 1, 2), status='Present')
+            Attendance.objects.create(employee=employee, date=date(2024, 1, 3), status='Absent')
+        Holiday.objects.create(name='New Year', date=date(2024, 1, 1))
+
+    def get(self, url, **params):
+        return self.client.get(url, params, HTTP_HOST='localhost')
+
+    def results(self, url, **params):
+        response = self.get(url, **params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def test_anonymous_requests_get_401(self):
+        for url in ('/api/v1/employees/', '/api/v1/attendance/', '/api/v1/holidays/', '/api/v1/attendance-percentage/'):
+            response = self.get(url)
+            self.assertEqual(response.status_code, 401, url)
+            self.assertEqual(response.json(), {'error': 'Authentication required.'})
+
+    def test_employees_only_see_their_own_rows(self):
+        self.client.force_login(self.user)
+        self.assertEqual([row['id'] for row in self.results('/api/v1/employees/')], [self.ada.pk])
+        self.assertEqual(
+            {row['employee_id'] for row in self.results('/api/v1/attendance/')}, {self.ada.pk}
+        )
+        self.assertEqual(
+            self.results('/api/v1/attendance-percentage/', as_of='2024-01-03'),
+            [{'employee_id': self.ada.pk, 'present': 1, 'absent': 1, 'leave': 0, 'percentage': 50.0}],
+        )
+        # Holidays have no owner
+        self.assertEqual(self.results('/api/v1/holidays/', fields='name'), [{'name': 'New Year'}])
+
+    def test_hr_walks_every_row_with_cursors(self):
+        sign_in_hr(self.client)
+        first = self.get('/api/v1/attendance/', limit=3, fields='employee_id,status').json()
+        self.assertEqual(len(first['results']), 3)
+        self.assertEqual(set(first['results'][0]), {'employee_id', 'status'})
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next'], HTTP_HOST='localhost').json()
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next'])
+        back = self.client.get(second['previous'], HTTP_HOST='localhost').json()
+        self.assertEqual(back['results'], first['results'])
+        self.assertEqual(
+            [row['id'] for row in self.results('/api/v1/employees/', department='Sales')], [self.bob.pk]
+        )
+
+    def test_bad_parameters_get_400(self):
+        sign_in_hr(self.client)
+        for params in ({'fields': 'salary'}, {'limit': '0'}, {'since': 'yesterday'}, {'employee': 'x'}):
+            response = self.get('/api/v1/attendance/', **params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
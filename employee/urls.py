@@ -10,13 +10,26 @@ from .views.employee_views import (
     RegisterView,
     logout_view,
 )
+from .views.api_views import (
+    AttendanceApiView,
+    AttendancePercentageApiView,
+    EmployeeApiView,
+    HolidayApiView,
+    LeaveRequestApiView,
+)
 from .views.hr_views import (
     ExportDataCSVView,
     ExportDataPageView,
+    ExportPreviewWindowView,
+    ExportJobCreateView,
+    ExportJobStatusView,
+    ExportJobDownloadView,
     HRDashboardView,
     EmployeeListView,
+    EmployeeSearchView,
     EmployeeDetailView,
     CreateEmployeeView,
+    OnboardEmployeesView,
     UpdateEmployeeView,
     DeleteEmployeeView,
     LeaveApprovalView,
@@ -24,9 +37,13 @@ from .views.hr_views import (
     LeaveRequestDetailView,
     AttendanceSummaryView,
     AttendanceDetailView,
+    BulkAttendanceView,
+    ImportAttendanceView,
     DeleteAttendanceView,
     UpdateAttendanceView,
     DeleteLeaveRequestView,
+    ReportingStatusView,
+    ViewMetricsView,
 )
 
 urlpatterns = [
@@ -51,12 +68,16 @@ urlpatterns = [
     path("hr/dashboard/", HRDashboardView.as_view(), name="hr_dashboard"),
 
     path("hr/employees/", EmployeeListView.as_view(), name="employee_list"),
+    path("hr/employees/search/", EmployeeSearchView.as_view(), name="employee_search"),
     path("hr/employees/<int:pk>/", EmployeeDetailView.as_view(), name="employee_detail"),
     path("hr/employees/create/", CreateEmployeeView.as_view(), name="create_employee"),
+    path("hr/employees/onboard/", OnboardEmployeesView.as_view(), name="onboard_employees"),
     path("hr/employees/update/<int:pk>/", UpdateEmployeeView.as_view(), name="update_employee"),
     path("hr/employees/delete/<int:pk>/", DeleteEmployeeView.as_view(), name="delete_employee"),
 
     path("hr/attendance/", AttendanceSummaryView.as_view(), name="attendance_summary"),
+    path("hr/attendance/bulk/", BulkAttendanceView.as_view(), name="bulk_attendance"),
+    path("hr/attendance/import/", ImportAttendanceView.as_view(), name="import_attendance"),
     path("hr/attendance/<int:employee_id>/", AttendanceDetailView.as_view(), name="attendance_detail"),
     path("hr/attendance/delete/<int:pk>/", DeleteAttendanceView.as_view(), name="delete_attendance"),
     path(
@@ -72,5 +93,23 @@ urlpatterns = [
     path("hr/leave-approvals/<int:pk>/", LeaveApprovalView.as_view(), name="leave_approval_action"),
     path('hr/export-data/', ExportDataPageView.as_view(), name='export_data_page'),
 
+    path('hr/export-data/preview/', ExportPreviewWindowView.as_view(), name='export_preview_window'),
     path('hr/export-data/csv/', ExportDataCSVView.as_view(), name='export_data'),
+    path('hr/export-data/jobs/', ExportJobCreateView.as_view(), name='export_job_create'),
+    path('hr/export-data/jobs/<int:pk>/', ExportJobStatusView.as_view(), name='export_job_status'),
+    path('hr/export-data/jobs/<int:pk>/download/', ExportJobDownloadView.as_view(), name='export_job_download'),
+
+    path("hr/metrics/", ViewMetricsView.as_view(), name="view_metrics"),
+    path("hr/reporting/status/", ReportingStatusView.as_view(), name="reporting_status"),
+
+    # Read-only JSON API; HR sees every row, everyone else only their own
+    path("api/v1/employees/", EmployeeApiView.as_view(), name="api_employees"),
+    path("api/v1/attendance/", AttendanceApiView.as_view(), name="api_attendance"),
+    path("api/v1/leave-requests/", LeaveRequestApiView.as_view(), name="api_leave_requests"),
+    path("api/v1/holidays/", HolidayApiView.as_view(), name="api_holidays"),
+    path(
+        "api/v1/attendance-percentage/",
+        AttendancePercentageApiView.as_view(),
+        name="api_attendance_percentage",
+    ),
 ]
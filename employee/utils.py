@@ -1,74 +1,138 @@
-from datetime import date, timedelta
-from .models import Attendance, Holiday
+from datetime import date
+from django.db.models import Count, F, Sum
+from .identity import get_identity
+from .models import Attendance, AttendanceMonthlySummary, Holiday
+from .workdays import WORKING_WEEK_DAYS, get_working_calendar
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import user_passes_test
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render, resolve_url
+from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 
-def calculate_attendance_percentage(employee):
-    start_date = employee.date_hired
-    end_date = date.today()
-
-    # Attendance records
-    records = Attendance.objects.filter(
-        employee=employee,
-        date__range=(start_date, end_date)
-    )
-
-    record_map = {r.date: r.status for r in records}
-
-    # Holiday dates set
-    holidays = set(
-        Holiday.objects.filter(
-            date__range=(start_date, end_date)
-        ).values_list('date', flat=True)
-    )
-
-    present = absent = leave = 0
-
-    current = start_date
-    while current <= end_date:
-
-        # Skip weekends
-        if current.weekday() >= 5:
-            current += timedelta(days=1)
-            continue
-
-        # Skip holidays
-        if current in holidays:
-            current += timedelta(days=1)
-            continue
-
-        status = record_map.get(current)
-
-        if status == 'Present':
-            present += 1
-        elif status == 'Leave':
-            leave += 1
+def calculate_attendance_stats(employees, end_date=None):
+    """
+    Attendance counts for many employees at once.
+
+    Returns a dict keyed by employee id with present, leave, absent and
+    percentage values over each employee's date_hired..end_date range.
+    Closed months are read from AttendanceMonthlySummary, so the result
+    is only as current as the rollup (see employee.rollups).
+    """
+    end_date = end_date or date.today()
+    employees = list(employees)
+    if not employees:
+        return {}
+
+    first_hired = min(emp.date_hired for emp in employees)
+    calendar = get_working_calendar(min(first_hired, end_date), end_date)
+
+    # Months before end_date's month come from the rollup table; only the
+    # last, still-open month is counted from raw Attendance rows.
+    cutoff = end_date.replace(day=1)
+    counts = {}
+    ids = [emp.pk for emp in employees]
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        closed = (
+            AttendanceMonthlySummary.objects.filter(employee_id__in=chunk, month__lt=cutoff)
+            .values('employee_id')
+            .annotate(present=Sum('present'), leave=Sum('leave'))
+        )
+        for row in closed:
+            counts[(row['employee_id'], 'Present')] = row['present']
+            counts[(row['employee_id'], 'Leave')] = row['leave']
+
+        rows = (
+            Attendance.objects.filter(
+                employee_id__in=chunk,
+                date__gte=F('employee__date_hired'),
+                date__range=(cutoff, end_date),
+                date__week_day__in=WORKING_WEEK_DAYS,
+                status__in=('Present', 'Leave'),
+            )
+            .exclude(date__in=Holiday.objects.values('date'))
+            .values('employee_id', 'status')
+            .annotate(total=Count('id'))
+        )
+        for row in rows:
+            key = (row['employee_id'], row['status'])
+            counts[key] = counts.get(key, 0) + row['total']
+
+    stats = {}
+    for emp in employees:
+        start_date = emp.date_hired
+        working_days = calendar.working_days_between(start_date, end_date)
+
+        present = counts.get((emp.pk, 'Present'), 0)
+        leave = counts.get((emp.pk, 'Leave'), 0)
+        absent = working_days - present - leave
+
+        total_working_days = present + absent
+        if total_working_days == 0:
+            percentage = 0
         else:
-            absent += 1
+            percentage = round((present / total_working_days) * 100, 2)
 
-        current += timedelta(days=1)
+        stats[emp.pk] = {
+            'present': present,
+            'absent': absent,
+            'leave': leave,
+            'percentage': percentage,
+        }
+    return stats
 
-    total_working_days = present + absent
 
-    if total_working_days == 0:
-        return 0
-
-    return round((present / total_working_days) * 100, 2)
+def calculate_attendance_percentage(employee):
+    return calculate_attendance_stats([employee])[employee.pk]['percentage']
 
 def is_hr(user):
-    return user.is_authenticated and user.groups.filter(name='HR').exists()
+    return user.is_authenticated and get_identity(user).is_hr
 
 def is_employee(user):
     """Check if user is an employee. HR users are also employees."""
     if not user.is_authenticated:
         return False
-
-    # HR users are employees too
-    if user.groups.filter(name='HR').exists():
-        return True
-
-    # If user has a linked Employee record
-    return hasattr(user, 'employee')
-
-hr_required = method_decorator(user_passes_test(is_hr), name='dispatch')
-employee_required = method_decorator(user_passes_test(is_employee), name='dispatch')
\ No newline at end of file
+    return get_identity(user).is_employee
+
+def is_hr_or_staff(user):
+    return user.is_authenticated and (user.is_staff or is_hr(user))
+
+def is_authenticated(user):
+    return user.is_authenticated
+
+def role_required(test_func, login_url=None):
+    """
+    Class decorator equivalent to method_decorator(user_passes_test(test_func),
+    name='dispatch') that also works on async views. There the test, which
+    loads the user and their identity from the database, runs through
+    sync_to_async, and the view is awaited only when it passes.
+    """
+    def decorator(view_class):
+        if not view_class.view_is_async:
+            return method_decorator(user_passes_test(test_func, login_url=login_url), name='dispatch')(view_class)
+
+        dispatch = view_class.dispatch
+
+        async def checked_dispatch(self, request, *args, **kwargs):
+            if await sync_to_async(test_func)(request.user):
+                return await dispatch(self, request, *args, **kwargs)
+            return redirect_to_login(request.get_full_path(), resolve_url(login_url or settings.LOGIN_URL))
+
+        view_class.dispatch = checked_dispatch
+        return view_class
+    return decorator
+
+hr_required = role_required(is_hr)
+hr_or_staff_required = role_required(is_hr_or_staff)
+employee_required = role_required(is_employee)
+login_required_view = role_required(is_authenticated, login_url=reverse_lazy('login'))
+
+async def arender(request, template_name, context=None):
+    """
+    render() for async views. Template rendering is sync work, and the
+    context processor's lazy values may query, so it runs in a thread
+    rather than on the event loop.
+    """
+    return await sync_to_async(render)(request, template_name, context)
@@ -0,0 +1,150 @@
+import hashlib
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import DataVersion
+from .routers import REPORTING, reporting_enabled
+
+
+def touch(*models):
+    """
+    Bump the data version of each model's table. Call inside the write's
+    transaction so the bump commits, or rolls back, with it; the model
+    signals do this for single saves and deletes, bulk writes call it
+    themselves.
+    """
+    now = timezone.now()
+    quote = connection.ops.quote_name
+    table = quote(DataVersion._meta.db_table)
+    name, version, changed_at = quote('table'), quote('version'), quote('changed_at')
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} ({name}, {version}, {changed_at}) VALUES (%s, 1, %s) '
+            f'ON CONFLICT ({name}) DO UPDATE SET '
+            f'{version} = {table}.{version} + 1, {changed_at} = excluded.{changed_at}',
+            [(model._meta.db_table, now) for model in sorted(set(models), key=lambda m: m._meta.db_table)],
+        )
+
+
+def data_versions(*models, using=None):
+    """{table: (version, changed_at)} for each model, in one query; unseen tables are (0, None)."""
+    tables = [model._meta.db_table for model in models]
+    rows = DataVersion.objects.using(using).filter(table__in=tables).values_list('table', 'version', 'changed_at')
+    versions = {table: (version, changed_at) for table, version, changed_at in rows}
+    return {table: versions.get(table, (0, None)) for table in tables}
+
+
+def reporting_lag(*models):
+    """
+    How far the reporting copy is behind default for `models`: per table,
+    the writes it has not seen yet, plus the time of the newest write on
+    each side and the gap between them (0 when it is up to date).
+    """
+    primary = data_versions(*models, using=DEFAULT_DB_ALIAS)
+    if not reporting_enabled():
+        return {'enabled': False, 'behind': {}, 'stale_seconds': 0}
+    replica = data_versions(*models, using=REPORTING)
+    behind = {table: primary[table][0] - replica[table][0] for table in primary}
+    primary_at = max((changed_at for _, changed_at in primary.values() if changed_at), default=None)
+    replica_at = max((changed_at for _, changed_at in replica.values() if changed_at), default=None)
+    stale = 0
+    if any(behind.values()) and primary_at:
+        stale = (primary_at - replica_at).total_seconds() if replica_at else None
+    return {
+        'enabled': True,
+        'behind': behind,
+        'default_changed_at': primary_at,
+        'reporting_changed_at': replica_at,
+        'stale_seconds': stale,
+    }
+
+
+def _request_versions(request, models):
+    """
+    The versions behind this request, or None while flash messages are
+    waiting to be shown, since a 304 would leave them out of the page.
+    Read once per request for both the ETag and Last-Modified.
+    """
+    if not hasattr(request, '_data_versions'):
+        pending = len(messages.get_messages(request))
+        request._data_versions = None if pending else data_versions(*models)
+    return request._data_versions
+
+
+def data_etag(request, models):
+    """
+    ETag for a page that only reads `models`: it changes with their data
+    versions and with everything else the page varies on (the URL and
+    query, the user, the CSRF cookie embedded in forms, and today's date).
+    """
+    versions = _request_versions(request, models)
+    if versions is None:
+        return None
+    parts = [
+        request.get_full_path(),
+        str(request.user.pk),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        date.today().isoformat(),
+    ] + [f'{table}:{version}' for table, (version, _) in sorted(versions.items())]
+    return hashlib.sha1('\n'.join(parts).encode()).hexdigest()
+
+
+def data_last_modified(request, models):
+    versions = _request_versions(request, models)
+    changes = [changed_at for _, changed_at in (versions or {}).values() if changed_at]
+    return max(changes) if changes else None
+
+
+def _conditional(request, models):
+    """(304/412 response or None, quoted ETag, Last-Modified timestamp) for a request."""
+    etag = data_etag(request, models)
+    etag = quote_etag(etag) if etag else None
+    changed_at = data_last_modified(request, models)
+    last_modified = int(changed_at.timestamp()) if changed_at else None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified), etag, last_modified
+
+
+def _add_validators(request, response, etag, last_modified):
+    if request.method in ('GET', 'HEAD'):
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified)
+        if etag:
+            response.headers.setdefault('ETag', etag)
+    return response
+
+
+def conditional_on(*models):
+    """
+    Class decorator for read-only views whose output depends only on
+    `models`: GET and HEAD get ETag and Last-Modified headers from the data
+    versions, and a matching If-None-Match (or If-Modified-Since) is
+    answered with 304 before the view runs. Works like Django's condition()
+    but on async views too. Put it below the access decorator so permission
+    checks still come first.
+    """
+    def decorator(view_class):
+        dispatch = view_class.dispatch
+
+        if view_class.view_is_async:
+            async def conditional_dispatch(self, request, *args, **kwargs):
+                response, etag, last_modified = await sync_to_async(_conditional)(request, models)
+                if response is None:
+                    response = await dispatch(self, request, *args, **kwargs)
+                return _add_validators(request, response, etag, last_modified)
+        else:
+            def conditional_dispatch(self, request, *args, **kwargs):
+                response, etag, last_modified = _conditional(request, models)
+                if response is None:
+                    response = dispatch(self, request, *args, **kwargs)
+                return _add_validators(request, response, etag, last_modified)
+
+        view_class.dispatch = conditional_dispatch
+        return view_class
+    return decorator
@@ -0,0 +1,92 @@
+from django.http import JsonResponse
+from django.views import View
+
+from ..api import RESOURCES, ApiError, attendance_percentages
+from ..identity import get_identity
+from ..models import Attendance, Employee, Holiday, LeaveRequest
+from ..versions import conditional_on
+
+COMPACT_JSON = {"separators": (",", ":")}
+
+
+def api_login_required(view_class):
+    """
+    Class decorator answering anonymous requests with a 401 JSON error
+    instead of redirecting to the login page, which API clients cannot use.
+    """
+    dispatch = view_class.dispatch
+
+    def checked_dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({"error": "Authentication required."}, status=401)
+        return dispatch(self, request, *args, **kwargs)
+
+    view_class.dispatch = checked_dispatch
+    return view_class
+
+
+def page_link(request, cursor_name, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query.pop("after", None)
+    query.pop("before", None)
+    query[cursor_name] = cursor
+    return f"{request.path}?{query.urlencode()}"
+
+
+class ApiListView(View):
+    """
+    A page of one API resource as {"results": [...], "next": url, "previous": url}.
+    Rows come straight from .values(), so no model instances are built.
+    """
+
+    resource = None
+
+    def rows(self, identity, params):
+        return RESOURCES[self.resource].page(identity, params)
+
+    def get(self, request):
+        try:
+            rows, page = self.rows(get_identity(request.user), request.GET)
+        except ApiError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        return JsonResponse(
+            {
+                "results": rows,
+                "next": page_link(request, "after", page.next_cursor),
+                "previous": page_link(request, "before", page.previous_cursor),
+            },
+            json_dumps_params=COMPACT_JSON,
+        )
+
+
+@api_login_required
+@conditional_on(Employee)
+class EmployeeApiView(ApiListView):
+    resource = "employees"
+
+
+@api_login_required
+@conditional_on(Attendance)
+class AttendanceApiView(ApiListView):
+    resource = "attendance"
+
+
+@api_login_required
+@conditional_on(LeaveRequest)
+class LeaveRequestApiView(ApiListView):
+    resource = "leave-requests"
+
+
+@api_login_required
+@conditional_on(Holiday)
+class HolidayApiView(ApiListView):
+    resource = "holidays"
+
+
+@api_login_required
+@conditional_on(Attendance, Employee, Holiday)
+class AttendancePercentageApiView(ApiListView):
+    def rows(self, identity, params):
+        return attendance_percentages(identity, params)
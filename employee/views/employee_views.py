@@ -1,37 +1,49 @@
 from datetime import date
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_protect, ensure_csrf_cookie
 from django.views import View
 
+from ..counters import aemployee_counts
 from ..forms import (
     LoginForm,
     RegistrationForm,
     EmployeeProfileForm,
+    LeaveFilterForm,
     LeaveRequestForm,
 )
+from ..identity import aget_identity, get_identity
+from ..leaves import LEAVE_SORTS, filter_leave_requests
 from ..models import Employee, Attendance, LeaveRequest
-from ..utils import calculate_attendance_percentage, employee_required
+from ..pagination import filter_query, keyset_paginate, parse_sort
+from ..utils import arender, calculate_attendance_percentage, employee_required, login_required_view
+
+# Own requests only, so sorting by employee would be meaningless
+MY_LEAVE_SORTS = {key: fields for key, fields in LEAVE_SORTS.items() if key != "employee"}
 
 
 def get_or_create_employee(user):
 
-    try:
-        # Try to get existing employee
-        employee = Employee.objects.get(user=user)
-        return employee
-    except Employee.DoesNotExist:
-        # Create new employee, handling potential email conflicts
-        email = user.email or f"{user.username}@company.com"
-        # Check if email already exists, if so, make it unique
-        if Employee.objects.filter(email=email).exists():
-            email = f"{user.username}@company.com"
-        
+    # Usually already loaded for this request by the role check
+    identity = get_identity(user)
+    if identity.employee is not None:
+        return identity.employee
+
+    # Create new employee, handling potential email conflicts
+    email = user.email or f"{user.username}@company.com"
+    # Check if email already exists, if so, make it unique
+    if Employee.objects.filter(email=email).exists():
+        email = f"{user.username}@company.com"
+
+    # The counter and data-version signals commit with the row
+    with transaction.atomic():
         employee = Employee.objects.create(
             user=user,
             first_name=user.first_name or user.username,
@@ -41,7 +53,20 @@ def get_or_create_employee(user):
             department='General',
             date_hired=date.today(),
         )
-        return employee
+    identity.employee = employee
+    return employee
+
+
+async def aget_or_create_employee(user):
+    """get_or_create_employee for async views; the role check has usually loaded it already."""
+    identity = await aget_identity(user)
+    if identity.employee is not None:
+        return identity.employee
+    return await sync_to_async(get_or_create_employee)(user)
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
 
 
 @login_required(login_url=reverse_lazy("login"))
@@ -50,32 +75,29 @@ def landing_redirect(request):
     return redirect("dashboard")
 
 
-@method_decorator(login_required(login_url=reverse_lazy("login")), name='dispatch')
+@login_required_view
 @employee_required
 class EmployeeDashboardView(View):
-
-
-    def get(self, request):
-        employee = get_or_create_employee(request.user)
-        attendance_count = Attendance.objects.filter(employee=employee).count()
-        leave_count = LeaveRequest.objects.filter(employee=employee).count()
+    async def get(self, request):
+        employee = await aget_or_create_employee(request.user)
         context = {
             "employee": employee,
             "total_employees": 1,
-            "total_attendance": attendance_count,
-            "total_leave_requests": leave_count,
+            **await aemployee_counts(employee.pk),
         }
-        return render(request, "employee/dashboard.html", context)
+        return await arender(request, "employee/dashboard.html", context)
 
 
-@method_decorator(login_required(login_url=reverse_lazy("login")), name='dispatch')
+@login_required_view
 @employee_required
 class MyAttendanceView(View):
-    def get(self, request):
-        employee = get_or_create_employee(request.user)
-        attendance_days = Attendance.objects.filter(employee=employee).order_by("-date")
-        attendance_percent = calculate_attendance_percentage(employee)
-        return render(
+    async def get(self, request):
+        employee = await aget_or_create_employee(request.user)
+        # Django runs async ORM calls on one shared thread, so these two
+        # reads are sequential whichever way they are awaited
+        attendance_days = await alist(Attendance.objects.filter(employee=employee).order_by("-date"))
+        attendance_percent = await sync_to_async(calculate_attendance_percentage)(employee)
+        return await arender(
             request,
             "employee/my_attendance.html",
             {
@@ -85,23 +107,36 @@ class MyAttendanceView(View):
         )
 
 
-@method_decorator(login_required(login_url=reverse_lazy("login")), name='dispatch')
+@login_required_view
 @employee_required
 class MyLeaveRequestsView(View):
-    def get(self, request):
-        employee = get_or_create_employee(request.user)
-        leave_requests = LeaveRequest.objects.filter(employee=employee).order_by(
-            "-start_date"
+    async def get(self, request):
+        employee = await aget_or_create_employee(request.user)
+        form = LeaveFilterForm(request.GET)
+        leaves = filter_leave_requests(
+            LeaveRequest.objects.filter(employee=employee),
+            form.cleaned_data if form.is_valid() else {},
         )
-        return render(
+        sort, ordering = parse_sort(request.GET.get("sort"), MY_LEAVE_SORTS, "-start_date")
+        page = await sync_to_async(keyset_paginate)(
+            leaves, ordering, after=request.GET.get("after"), before=request.GET.get("before")
+        )
+        return await arender(
             request,
             "employee/my_leave_requests.html",
-            {"leave_requests": leave_requests},
+            {
+                "leave_requests": page,
+                "page": page,
+                "form": form,
+                "sort": sort,
+                "filter_query": filter_query(request.GET),
+            },
         )
 
 
-@method_decorator(login_required(login_url=reverse_lazy("login")), name='dispatch')
+@login_required_view
 @employee_required
+@method_decorator(transaction.atomic, name='post')
 class ApplyLeaveView(View):
     def get(self, request):
         form = LeaveRequestForm()
@@ -119,7 +154,7 @@ class ApplyLeaveView(View):
         return render(request, "employee/apply_leave.html", {"form": form})
 
 
-@method_decorator(login_required(login_url=reverse_lazy("login")), name='dispatch')
+@login_required_view
 @employee_required
 class MyProfileView(View):
     def get(self, request):
@@ -127,8 +162,9 @@ class MyProfileView(View):
         return render(request, "employee/my_profile.html", {"employee": employee})
 
 
-@method_decorator(login_required(login_url=reverse_lazy("login")), name='dispatch')
+@login_required_view
 @employee_required
+@method_decorator(transaction.atomic, name='post')
 class EditMyProfileView(View):
     def get(self, request):
         employee = get_or_create_employee(request.user)
@@ -183,6 +219,7 @@ class LoginView(View):
 
 
 @method_decorator(ensure_csrf_cookie, name='dispatch')
+@method_decorator(transaction.atomic, name='post')
 class RegisterView(View):
     def get(self, request):
         if request.user.is_authenticated:
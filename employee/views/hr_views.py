@@ -1,40 +1,158 @@
 import calendar
 import csv
+import io
 from datetime import date, timedelta
+from django.conf import settings
 from django.contrib.auth.models import User, Group
 from django.utils.text import slugify
 from django.contrib import messages
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse_lazy, reverse
+from django.utils.decorators import method_decorator
 from django.views import View
 from requests import request
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from urllib.parse import urlencode
-from ..forms import HRCreateEmployeeForm
-from ..models import Employee, Attendance, LeaveRequest, Holiday
-from ..utils import calculate_attendance_percentage, hr_required
+from ..attendance import bulk_mark_attendance, working_days_in_range
+from ..forms import (
+    AttendanceImportForm,
+    BulkAttendanceForm,
+    EmployeeFilterForm,
+    EmployeeOnboardingForm,
+    HRCreateEmployeeForm,
+    LeaveFilterForm,
+)
+from ..imports import AttendanceImporter, RejectSample
+from ..onboarding import DEFAULT_PASSWORD, EmployeeOnboarding
+from ..leaves import LEAVE_SORTS, approve_leave_requests, filter_leave_requests, reject_leave_requests
+from ..counters import adashboard_counts
+from ..downloads import serve_file
+from ..exports import (
+    Echo,
+    enqueue_export_job,
+    export_employees,
+    export_file_name,
+    export_format,
+    export_params,
+    iter_export_rows,
+    iter_long_gzip,
+    preview_window,
+    resolve_export_range,
+)
+from ..metrics import registry as view_metrics
+from ..search import NAME_COLUMNS, filter_employees, search_employees
+from ..pagination import filter_query, keyset_paginate, keyset_paginate_list, parse_sort
+from ..models import Employee, Attendance, LeaveRequest, Holiday, ExportJob
+from ..utils import (
+    arender,
+    calculate_attendance_percentage,
+    calculate_attendance_stats,
+    hr_or_staff_required,
+    hr_required,
+)
+from ..rollups import add_months, month_start
+from ..routers import iter_from_reporting, reporting_view
+from ..versions import conditional_on, reporting_lag
+from ..workdays import get_working_calendar
+from django.db import transaction
 from django.db.models import Q
 
 
 @hr_required
+@conditional_on(Attendance, Employee, LeaveRequest)
 class HRDashboardView(View):
-    def get(self, request):
-        context = {
-            "total_employees": Employee.objects.count(),
-            "total_attendance": Attendance.objects.count(),
-            "total_leave_requests": LeaveRequest.objects.count(),
-        }
-        return render(request, "hr/dashboard.html", context)
+    async def get(self, request):
+        return await arender(request, "hr/dashboard.html", await adashboard_counts())
+
+
+EMPLOYEE_SORTS = {
+    "name": ("last_name", "first_name"),
+    "email": ("email",),
+    "department": ("department",),
+    "date_hired": ("date_hired",),
+    "attendance": ("attendance_percent",),
+}
+
+
+def employee_departments():
+    return list(Employee.objects.order_by("department").values_list("department", flat=True).distinct())
 
 
 @hr_required
+@conditional_on(Attendance, Employee, Holiday)
 class EmployeeListView(View):
     def get(self, request):
+        form = EmployeeFilterForm(request.GET, departments=employee_departments())
+        filters = form.cleaned_data if form.is_valid() else {}
+
         employees = Employee.objects.all()
-        return render(request, "hr/employee_list.html", {"employees": employees})
+        if filters.get("q"):
+            employees = filter_employees(employees, filters["q"])
+        if filters.get("department"):
+            employees = employees.filter(department=filters["department"])
+        if filters.get("date_from"):
+            employees = employees.filter(date_hired__gte=filters["date_from"])
+        if filters.get("date_to"):
+            employees = employees.filter(date_hired__lte=filters["date_to"])
+
+        sort, ordering = parse_sort(request.GET.get("sort"), EMPLOYEE_SORTS, "-date_hired")
+        after, before = request.GET.get("after"), request.GET.get("before")
+        min_attendance = filters.get("min_attendance")
+
+        if sort.lstrip("-") == "attendance" or min_attendance is not None:
+            # Attendance is computed, not a column: rank every matching employee in memory
+            employees = list(employees)
+            stats = calculate_attendance_stats(employees)
+            for emp in employees:
+                emp.attendance_percent = stats[emp.pk]["percentage"]
+            if min_attendance is not None:
+                employees = [emp for emp in employees if emp.attendance_percent >= min_attendance]
+            page = keyset_paginate_list(employees, ordering, after=after, before=before)
+        else:
+            page = keyset_paginate(employees, ordering, after=after, before=before)
+            stats = calculate_attendance_stats(page.object_list)
+            for emp in page:
+                emp.attendance_percent = stats[emp.pk]["percentage"]
+
+        return render(
+            request,
+            "hr/employee_list.html",
+            {
+                "employees": page,
+                "page": page,
+                "form": form,
+                "sort": sort,
+                "filter_query": filter_query(request.GET),
+            },
+        )
+
+
+@hr_required
+class EmployeeSearchView(View):
+    """Ranked prefix search over name, email, position and department for typeahead."""
+
+    def get(self, request):
+        query = request.GET.get("q", "").strip()
+        try:
+            limit = min(max(int(request.GET.get("limit", 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        results = [
+            {
+                "id": emp.pk,
+                "name": f"{emp.first_name} {emp.last_name}",
+                "email": emp.email,
+                "position": emp.position,
+                "department": emp.department,
+                "url": reverse("employee_detail", args=[emp.pk]),
+            }
+            for emp in (search_employees(query, limit=limit) if query else [])
+        ]
+        return JsonResponse({"query": query, "results": results})
 
 
 @hr_required
+@conditional_on(Attendance, Employee, Holiday)
 class EmployeeDetailView(View):
     def get(self, request, pk):
         employee = get_object_or_404(Employee, pk=pk)
@@ -49,6 +167,7 @@ class EmployeeDetailView(View):
 
 
 @hr_required
+@method_decorator(transaction.atomic, name='post')
 class CreateEmployeeView(View):
     def get(self, request):
         form = HRCreateEmployeeForm()
@@ -93,6 +212,29 @@ class CreateEmployeeView(View):
 
 
 @hr_required
+class OnboardEmployeesView(View):
+    def get(self, request):
+        context = {"form": EmployeeOnboardingForm(), "default_password": DEFAULT_PASSWORD}
+        return render(request, "hr/onboard_employees.html", context)
+
+    def post(self, request):
+        form = EmployeeOnboardingForm(request.POST, request.FILES)
+        context = {"form": form, "default_password": DEFAULT_PASSWORD}
+        if form.is_valid():
+            rejects = RejectSample()
+            stream = io.TextIOWrapper(form.cleaned_data["file"].file, encoding="utf-8-sig", newline="")
+            try:
+                context["stats"] = EmployeeOnboarding(rejects=rejects).run(stream)
+            except ValueError as exc:
+                form.add_error("file", str(exc))
+            else:
+                context["rejects"] = rejects.rows
+                messages.success(request, f"{context['stats']['created']} employee(s) created.")
+        return render(request, "hr/onboard_employees.html", context)
+
+
+@hr_required
+@method_decorator(transaction.atomic, name='post')
 class UpdateEmployeeView(View):
 
     def get(self, request, pk):
@@ -169,6 +311,7 @@ class UpdateEmployeeView(View):
         )
 
 @hr_required
+@method_decorator(transaction.atomic, name='post')
 class DeleteEmployeeView(View):
     def post(self, request, pk):
         Employee.objects.filter(pk=pk).delete()
@@ -177,37 +320,57 @@ class DeleteEmployeeView(View):
 
 
 @hr_required
+@method_decorator(transaction.atomic, name='post')
 class LeaveApprovalView(View):
     def get(self, request):
-        leaves = LeaveRequest.objects.filter(status="Pending")
-        return render(request, "hr/leave_approvals.html", {"leaves": leaves})
+        form = LeaveFilterForm(request.GET, departments=employee_departments(), with_status=False)
+        leaves = filter_leave_requests(
+            LeaveRequest.objects.filter(status="Pending").select_related("employee"),
+            form.cleaned_data if form.is_valid() else {},
+        )
+        sort, ordering = parse_sort(request.GET.get("sort"), LEAVE_SORTS, "start_date")
+        page = keyset_paginate(leaves, ordering, after=request.GET.get("after"), before=request.GET.get("before"))
+        return render(
+            request,
+            "hr/leave_approvals.html",
+            {
+                "leaves": page,
+                "page": page,
+                "form": form,
+                "sort": sort,
+                "filter_query": filter_query(request.GET),
+            },
+        )
 
-    def post(self, request, pk):
-        leave = get_object_or_404(LeaveRequest, pk=pk)
+    def post(self, request, pk=None):
         action = request.POST.get("action")
 
+        if pk is not None:
+            leaves = LeaveRequest.objects.filter(pk=get_object_or_404(LeaveRequest, pk=pk).pk)
+        else:
+            # Batch action from the approvals page: only pending requests
+            leaves = LeaveRequest.objects.filter(
+                pk__in=request.POST.getlist("leave_ids"), status="Pending"
+            )
+
         if action == "approve":
-            leave.status = "Approved"
-            leave.save()
-
-            current = leave.start_date
-            while current <= leave.end_date:
-                Attendance.objects.update_or_create(
-                    employee=leave.employee,
-                    date=current,
-                    defaults={"status": "Leave"},
-                )
-                current += timedelta(days=1)
-            messages.success(request, "Leave approved and attendance updated.")
+            count = approve_leave_requests(leaves)
+            if pk is not None:
+                messages.success(request, "Leave approved and attendance updated.")
+            else:
+                messages.success(request, f"{count} leave request(s) approved and attendance updated.")
 
         elif action == "reject":
-            leave.status = "Rejected"
-            leave.save()
-            messages.info(request, "Leave rejected.")
+            count = reject_leave_requests(leaves)
+            if pk is not None:
+                messages.info(request, "Leave rejected.")
+            else:
+                messages.info(request, f"{count} leave request(s) rejected.")
 
         return redirect("leave_approvals")
 
 @hr_required
+@method_decorator(transaction.atomic, name='post')
 class DeleteLeaveRequestView(View):
     def post(self, request, pk):
         LeaveRequest.objects.filter(pk=pk).delete()
@@ -215,98 +378,130 @@ class DeleteLeaveRequestView(View):
         return redirect("leave_request_list")
     
 @hr_required
+@conditional_on(Employee, LeaveRequest)
 class LeaveRequestListView(View):
     def get(self, request):
-        leave_requests = LeaveRequest.objects.all()
+        form = LeaveFilterForm(request.GET, departments=employee_departments())
+        leaves = filter_leave_requests(
+            LeaveRequest.objects.select_related("employee"),
+            form.cleaned_data if form.is_valid() else {},
+        )
+        sort, ordering = parse_sort(request.GET.get("sort"), LEAVE_SORTS, "-start_date")
+        page = keyset_paginate(leaves, ordering, after=request.GET.get("after"), before=request.GET.get("before"))
         return render(
-            request, "hr/leave_request_list.html", {"leave_requests": leave_requests}
+            request,
+            "hr/leave_request_list.html",
+            {
+                "leave_requests": page,
+                "page": page,
+                "form": form,
+                "sort": sort,
+                "filter_query": filter_query(request.GET),
+            },
         )
     
 @hr_required
+@conditional_on(Employee, LeaveRequest)
 class LeaveRequestDetailView(View):
     def get(self, request, pk):
         leave = get_object_or_404(LeaveRequest, pk=pk)
         return render(request, "hr/leave_request_detail.html", {"leave": leave})
 
 @hr_required
+@reporting_view
+@conditional_on(Attendance, Employee, Holiday)
 class AttendanceSummaryView(View):
     def get(self, request):
-        employees = Employee.objects.all()
+        employees = list(Employee.objects.all())
+        stats = calculate_attendance_stats(employees)
         data = []
         for employee in employees:
             data.append(
                 {
                     "employee": employee,
-                    "attendance_percent": calculate_attendance_percentage(employee),
+                    "attendance_percent": stats[employee.pk]["percentage"],
                 }
             )
         return render(request, "hr/attendance_summary.html", {"data": data})
 
 
 @hr_required
+@conditional_on(Attendance, Employee, Holiday)
 class AttendanceDetailView(View):
+    """One month or quarter of an employee's working days, newest first."""
+
+    PERIOD_MONTHS = {"month": 1, "quarter": 3}
+
     def get(self, request, employee_id):
-        from datetime import date, timedelta
-        
         employee = get_object_or_404(Employee, pk=employee_id)
-        
-        # Get all attendance records for this employee
+        today = date.today()
+
+        period = request.GET.get("period")
+        if period not in self.PERIOD_MONTHS:
+            period = "month"
+        span = self.PERIOD_MONTHS[period]
+
+        try:
+            year, month = (int(part) for part in request.GET.get("start", "").split("-"))
+            period_start = date(year, month, 1)
+        except ValueError:
+            period_start = month_start(today)
+        # Keep navigation within the employee's tenure
+        period_start = min(max(period_start, month_start(employee.date_hired)), month_start(today))
+        period_start = add_months(period_start, -((period_start.month - 1) % span))
+        period_end = add_months(period_start, span) - timedelta(days=1)
+
+        first_day = max(period_start, employee.date_hired)
+        last_day = min(period_end, today)
+
         attendance_records = {
-            record.date: record.status 
-            for record in Attendance.objects.filter(employee=employee)
+            record.date: record
+            for record in Attendance.objects.filter(
+                employee=employee, date__range=(first_day, last_day)
+            )
         }
-        
-        # Get all holidays
-        holidays = set(
-            Holiday.objects.filter(
-                date__gte=employee.date_hired
-            ).values_list('date', flat=True)
-        )
-        
-        # Generate all dates from date_hired to today
-        all_dates = []
-        current_date = employee.date_hired
-        today = date.today()
-        
-        while current_date <= today:
+        calendar = get_working_calendar(first_day, max(first_day, last_day))
+
+        attendance_days = []
+        current_date = last_day
+        while current_date >= first_day:
             # Skip weekends (Saturday=5, Sunday=6)
-            if current_date.weekday() < 5:  # Monday=0 to Friday=4
-                # Check if it's a holiday
-                if current_date in holidays:
+            if current_date.weekday() < 5:
+                if calendar.is_holiday(current_date):
                     status = "Holiday"
                     attendance_obj = None
                 else:
-                    # Get status from attendance records, default to "Absent"
-                    status = attendance_records.get(current_date, "Absent")
-                    # Get attendance object if it exists
-                    attendance_obj = Attendance.objects.filter(
-                        employee=employee, 
-                        date=current_date
-                    ).first()
-                
-                all_dates.append({
+                    attendance_obj = attendance_records.get(current_date)
+                    status = attendance_obj.status if attendance_obj else "Absent"
+
+                attendance_days.append({
                     'date': current_date,
                     'status': status,
                     'attendance_obj': attendance_obj,
                 })
-            
-            current_date += timedelta(days=1)
-        
-        # Sort by date descending (most recent first)
-        all_dates.sort(key=lambda x: x['date'], reverse=True)
-        
+            current_date -= timedelta(days=1)
+
+        previous_start = add_months(period_start, -span)
+        next_start = add_months(period_start, span)
+
         return render(
             request,
             "hr/attendance_detail.html",
             {
                 "employee": employee,
-                "attendance_days": all_dates,
+                "attendance_days": attendance_days,
                 "attendance_percent": calculate_attendance_percentage(employee),
+                "period": period,
+                "period_start": period_start,
+                "period_end": period_end,
+                "previous_start": previous_start if period_start > employee.date_hired else None,
+                "next_start": next_start if next_start <= today else None,
             },
         )
 
 
 @hr_required
+@method_decorator(transaction.atomic, name='post')
 class DeleteAttendanceView(View):
     def post(self, request, pk):
         Attendance.objects.filter(pk=pk).delete()
@@ -315,6 +510,7 @@ class DeleteAttendanceView(View):
 
 
 @hr_required
+@method_decorator(transaction.atomic, name='post')
 class UpdateAttendanceView(View):
     def get(self, request, employee_id, date):
         from datetime import datetime
@@ -357,10 +553,97 @@ class UpdateAttendanceView(View):
 
 
 @hr_required
+@method_decorator(transaction.atomic, name='post')
+class BulkAttendanceView(View):
+    """Mark attendance for a department (or everyone) over a day or date range."""
+
+    def get_departments(self):
+        return employee_departments()
+
+    def get_employees(self, department):
+        employees = Employee.objects.order_by("first_name", "last_name")
+        if department:
+            employees = employees.filter(department=department)
+        return employees
+
+    def render_form(self, request, form, department):
+        return render(
+            request,
+            "hr/bulk_attendance.html",
+            {
+                "form": form,
+                "employees": self.get_employees(department).only("id", "first_name", "last_name", "department"),
+                "statuses": [value for value, _ in Attendance._meta.get_field("status").choices],
+            },
+        )
+
+    def get(self, request):
+        department = request.GET.get("department", "")
+        form = BulkAttendanceForm(
+            departments=self.get_departments(),
+            initial={"start_date": date.today(), "department": department},
+        )
+        return self.render_form(request, form, department)
+
+    def post(self, request):
+        form = BulkAttendanceForm(request.POST, departments=self.get_departments())
+        if not form.is_valid():
+            return self.render_form(request, form, request.POST.get("department", ""))
+
+        data = form.cleaned_data
+        statuses = dict(Attendance._meta.get_field("status").choices)
+        # Without the page's script every select is posted as status_<id>
+        overrides = {}
+        for key, value in request.POST.items():
+            if key.startswith("status_") and value in statuses:
+                try:
+                    overrides[int(key[len("status_"):])] = value
+                except ValueError:
+                    continue
+        overrides.update(data["overrides"])
+
+        days = working_days_in_range(data["start_date"], data["end_date"])
+        if not days:
+            messages.warning(request, "There are no working days in the selected range.")
+            return redirect("bulk_attendance")
+
+        written = bulk_mark_attendance(
+            self.get_employees(data["department"]),
+            days,
+            data["status"],
+            overrides=overrides,
+            overwrite=data["overwrite"],
+        )
+        messages.success(
+            request,
+            f"Attendance saved for {len(days)} working day(s): {written} record(s) written.",
+        )
+        return redirect("attendance_summary")
+
+
+@hr_required
+class ImportAttendanceView(View):
+    def get(self, request):
+        return render(request, "hr/import_attendance.html", {"form": AttendanceImportForm()})
+
+    def post(self, request):
+        form = AttendanceImportForm(request.POST, request.FILES)
+        context = {"form": form}
+        if form.is_valid():
+            rejects = RejectSample()
+            stream = io.TextIOWrapper(form.cleaned_data["file"].file, encoding="utf-8-sig", newline="")
+            context["stats"] = AttendanceImporter(rejects=rejects).run(stream)
+            context["rejects"] = rejects.rows
+            messages.success(request, f"{context['stats']['inserted']} attendance record(s) imported.")
+        return render(request, "hr/import_attendance.html", context)
+
+
+@hr_required
+@reporting_view
+@conditional_on(Employee)
 class ExportDataPageView(View):
     def get(self, request, *args, **kwargs):
-        # Get distinct department names from Employee model
-        departments = Employee.objects.values_list('department', flat=True).distinct()
+        departments = employee_departments()
         months = [(i, calendar.month_name[i]) for i in range(1, 13)]
         
         # Filters from GET params
@@ -374,7 +657,7 @@ class ExportDataPageView(View):
         if dept_id:
             employees = employees.filter(department=dept_id)
         if employee_name:
-            employees = employees.filter(first_name__icontains=employee_name) | employees.filter(last_name__icontains=employee_name)
+            employees = filter_employees(employees, employee_name, NAME_COLUMNS)
         if month:
             month = int(month)
             year = date.today().year
@@ -392,40 +675,15 @@ class ExportDataPageView(View):
             start_date = None
             end_date = None
 
-        preview = []
-        days = []
-        days_formatted = []
+        # Only the grid's shell is rendered here; the cells are fetched a
+        # window at a time from ExportPreviewWindowView as the user scrolls
+        preview = None
         if start_date and end_date:
-            delta = end_date - start_date
-            days = [start_date + timedelta(days=i) for i in range(delta.days + 1)]
-            # Format days for display with month and year (e.g., "10 Dec 2025")
-            days_formatted = [d.strftime("%d %b %Y") for d in days]
-
-            # Prepare preview data
-            today = date.today()
-            holidays = set(Holiday.objects.filter(date__range=(start_date, end_date)).values_list('date', flat=True))
-            for emp in employees:
-                row = {"employee_name": f"{emp.first_name} {emp.last_name}", "statuses": []}
-                join_date = emp.date_hired
-                attendances = {att.date: att.status for att in Attendance.objects.filter(employee=emp, date__range=(start_date, end_date))}
-                for d in days:
-                    if d < join_date:
-                        row["statuses"].append('')
-                    elif d > today:
-                        # Future dates show blank, except holidays
-                        if d in holidays:
-                            row["statuses"].append("Holiday")
-                        else:
-                            row["statuses"].append('')
-                    elif d in holidays:
-                        row["statuses"].append("Holiday")
-                    elif d.weekday() >= 5:  # Saturday=5, Sunday=6
-                        row["statuses"].append("-")
-                    elif d in attendances:
-                        row["statuses"].append(attendances[d])
-                    else:
-                        row["statuses"].append("Absent")
-                preview.append(row)
+            preview = {
+                "start_date": start_date.isoformat(),
+                "total_rows": employees.count(),
+                "total_days": (end_date - start_date).days + 1,
+            }
 
         # Build download URL with all filter parameters
         query_params = {}
@@ -444,81 +702,145 @@ class ExportDataPageView(View):
         if query_params:
             download_url += '?' + urlencode(query_params)
         
+        preview_url = reverse('export_preview_window')
+        if query_params:
+            preview_url += '?' + urlencode(query_params)
+
         context = {
             "departments": departments,
             "months": months,
             "preview": preview,
-            "days": days,
-            "days_formatted": days_formatted,
+            "preview_url": preview_url,
             "download_url": download_url
         }
         return render(request, "hr/export_data.html", context)
+
+
+def _window_int(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except ValueError:
+        return default
+
+
+@hr_required
+@reporting_view
+@conditional_on(Attendance, Employee, Holiday)
+class ExportPreviewWindowView(View):
+    """
+    A window of the export preview grid as JSON: ?row_offset=&rows= employees
+    and ?day_offset=&days= days of the filtered range, with cells encoded
+    as one status-code digit per day plus a legend.
+    """
+
+    def get(self, request):
+        params = export_params(request.GET)
+        try:
+            start_date, end_date = resolve_export_range(params)
+        except ValueError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        window = preview_window(
+            export_employees(params),
+            start_date,
+            end_date,
+            _window_int(request.GET, "row_offset", 0),
+            _window_int(request.GET, "rows", 50),
+            _window_int(request.GET, "day_offset", 0),
+            _window_int(request.GET, "days", 31),
+        )
+        return JsonResponse(window)
     
 @hr_required
+@reporting_view
+@conditional_on(Attendance, Employee, Holiday)
 class ExportDataCSVView(View):
     def get(self, request, *args, **kwargs):
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-        dept_id = request.GET.get('department')  # department name
-        employee_name = request.GET.get('employee_name')
-        month = request.GET.get('month')
-
-        # Handle month filter (same logic as preview)
-        if month:
-            month = int(month)
-            year = date.today().year
-            start_date = date(year, month, 1)
-            end_date = date(year, month, calendar.monthrange(year, month)[1])
-        elif start_date and end_date:
-            start_date = date.fromisoformat(start_date)
-            end_date = date.fromisoformat(end_date)
-            # Validate that end_date is not earlier than start_date
-            if end_date < start_date:
-                return HttpResponse("Error: End date cannot be earlier than start date.", status=400)
+        params = export_params(request.GET)
+        try:
+            start_date, end_date = resolve_export_range(params)
+        except ValueError as exc:
+            return HttpResponse(f"Error: {exc}", status=400)
+        employees = export_employees(params)
+
+        # Rows are produced while the response streams, after dispatch has returned
+        if export_format(params) == 'long':
+            content = iter_from_reporting(iter_long_gzip(employees, start_date, end_date))
+            content_type = 'application/gzip'
         else:
-            start_date = date.today().replace(day=1)
-            end_date = date.today()
+            writer = csv.writer(Echo())
+            content = (
+                writer.writerow(row) for row in iter_from_reporting(iter_export_rows(employees, start_date, end_date))
+            )
+            content_type = 'text/csv'
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{export_file_name(params)}"'
+        return response
+
+
+def export_job_payload(job):
+    payload = {
+        "id": job.pk,
+        "status": job.status,
+        "progress": job.progress,
+        "rows_done": job.rows_done,
+        "rows_total": job.rows_total,
+        "status_url": reverse("export_job_status", args=[job.pk]),
+        "format": export_format(job.params),
+        "download_url": None,
+        "error": job.error,
+    }
+    if job.status == "Done":
+        payload["download_url"] = reverse("export_job_download", args=[job.pk])
+    return payload
 
-        employees = Employee.objects.all().order_by('id')
-        if dept_id:
-            employees = employees.filter(department=dept_id)
-        if employee_name:
-            employees = employees.filter(first_name__icontains=employee_name) | employees.filter(last_name__icontains=employee_name)
 
-        today = date.today()
-        holidays = set(Holiday.objects.filter(date__range=(start_date, end_date)).values_list('date', flat=True))
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="employee_data.csv"'
-        writer = csv.writer(response)
-
-        # Header row
-        num_days = (end_date - start_date).days + 1
-        header = ["Employee Name"] + [(start_date + timedelta(days=i)).strftime("%d %b %Y") for i in range(num_days)]
-        writer.writerow(header)
-
-        for emp in employees:
-            row = [f"{emp.first_name} {emp.last_name}"]
-            join_date = emp.date_hired
-            attendances = {att.date: att.status for att in Attendance.objects.filter(employee=emp, date__range=(start_date, end_date))}
-            for i in range(num_days):
-                current_date = start_date + timedelta(days=i)
-                if current_date < join_date:
-                    row.append('')
-                elif current_date > today:
-                    # Future dates show blank, except holidays
-                    if current_date in holidays:
-                        row.append('Holiday')
-                    else:
-                        row.append('')
-                elif current_date in holidays:
-                    row.append('Holiday')
-                elif current_date.weekday() >= 5:
-                    row.append('-')
-                elif current_date in attendances:
-                    row.append(attendances[current_date])
-                else:
-                    row.append('Absent')
-            writer.writerow(row)
+@hr_required
+@method_decorator(transaction.atomic, name='post')
+class ExportJobCreateView(View):
+    def post(self, request):
+        params = export_params(request.POST)
+        try:
+            resolve_export_range(params)
+        except ValueError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        job = enqueue_export_job(params, user=request.user)
+        return JsonResponse(export_job_payload(job), status=202)
+
+
+@hr_required
+class ExportJobStatusView(View):
+    def get(self, request, pk):
+        job = get_object_or_404(ExportJob, pk=pk)
+        return JsonResponse(export_job_payload(job))
+
+
+@hr_required
+class ExportJobDownloadView(View):
+    def get(self, request, pk):
+        job = get_object_or_404(ExportJob, pk=pk, status="Done")
+        content_type = "application/gzip" if export_format(job.params) == "long" else "text/csv"
+        return serve_file(request, job.file_path, export_file_name(job.params), content_type)
 
-        return response
\ No newline at end of file
+
+@hr_or_staff_required
+class ReportingStatusView(View):
+    """How far the reporting database that exports and reports read from is behind default."""
+
+    def get(self, request):
+        return JsonResponse(reporting_lag(Attendance, Employee, Holiday, LeaveRequest))
+
+
+@hr_or_staff_required
+class ViewMetricsView(View):
+    """Per-view request metrics as JSON, or Prometheus text with ?format=prometheus."""
+
+    def get(self, request):
+        if request.GET.get("format") == "prometheus":
+            return HttpResponse(view_metrics.prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+        snapshot = view_metrics.snapshot()
+        snapshot["enabled"] = settings.VIEW_METRICS_ENABLED
+        return JsonResponse(snapshot)
+
+    def post(self, request):
+        view_metrics.reset()
+        return JsonResponse({"reset": True})
@@ -0,0 +1,109 @@
+from array import array
+from datetime import date, timedelta
+from threading import Lock
+
+from django.db import router
+
+from .models import Holiday
+from .versions import data_versions
+
+# Range covered by the prefix table before any holiday or query widens it
+DEFAULT_FIRST_DAY = date(2000, 1, 1)
+DEFAULT_HORIZON_DAYS = 366
+
+# Django's week_day lookup numbers days Sunday=1 .. Saturday=7
+WORKING_WEEK_DAYS = (2, 3, 4, 5, 6)
+
+
+class WorkingCalendar:
+    """
+    Working-day calendar over a fixed span of dates.
+
+    A working day is a Monday-Friday date that is not a Holiday. The
+    calendar keeps a prefix sum of working days so range counts and
+    lookups are constant time.
+    """
+
+    def __init__(self, holidays, first_day, last_day):
+        self.holidays = frozenset(holidays)
+        self.first_day = first_day
+        self.last_day = last_day
+
+        # prefix[i] = working days in [first_day, first_day + i)
+        prefix = array('l', [0])
+        running = 0
+        current = first_day
+        while current <= last_day:
+            if current.weekday() < 5 and current not in self.holidays:
+                running += 1
+            prefix.append(running)
+            current += timedelta(days=1)
+        self._prefix = prefix
+
+    def covers(self, start_date, end_date):
+        return self.first_day <= start_date and end_date <= self.last_day
+
+    def is_holiday(self, day):
+        return day in self.holidays
+
+    def is_working_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def working_days_between(self, start_date, end_date):
+        """Number of working days between start_date and end_date inclusive."""
+        if start_date > end_date:
+            return 0
+        start = (start_date - self.first_day).days
+        end = (end_date - self.first_day).days + 1
+        return self._prefix[end] - self._prefix[start]
+
+
+# Per database alias: (Holiday data version, holiday dates, calendar)
+_cache = {}
+_lock = Lock()
+
+
+def get_working_calendar(start_date=None, end_date=None):
+    """
+    Return the shared WorkingCalendar, covering start_date..end_date.
+
+    Holiday dates are loaded once per process and reused while the Holiday
+    data version (see employee.versions) is unchanged, which is checked on
+    every call, so a holiday saved by another process is picked up by the
+    next lookup. When a range falls outside the cached span the prefix
+    table is rebuilt from the cached holidays without reloading them.
+    """
+    today = date.today()
+    start_date = start_date or today
+    end_date = end_date or today
+
+    # Reads inside reporting_reads() see the reporting copy's holidays
+    alias = router.db_for_read(Holiday)
+    version = data_versions(Holiday, using=alias)[Holiday._meta.db_table]
+    cached = _cache.get(alias)
+    if cached is not None and cached[0] == version and cached[2].covers(start_date, end_date):
+        return cached[2]
+
+    with _lock:
+        cached = _cache.get(alias)
+        bounds = [DEFAULT_FIRST_DAY, start_date, today + timedelta(days=DEFAULT_HORIZON_DAYS), end_date]
+        if cached is not None and cached[0] == version:
+            holidays = cached[1]
+            bounds += [cached[2].first_day, cached[2].last_day]
+        else:
+            holidays = set(Holiday.objects.using(alias).values_list('date', flat=True))
+        if holidays:
+            bounds += [min(holidays), max(holidays)]
+
+        calendar = WorkingCalendar(holidays, min(bounds), max(bounds))
+        _cache[alias] = (version, holidays, calendar)
+        return calendar
+
+
+def invalidate_working_calendar():
+    """
+    Drop this process's cached calendars at once, for writes that have not
+    bumped the Holiday data version yet; connected to Holiday signals.
+    """
+    with _lock:
+        _cache.clear()
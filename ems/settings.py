@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'employee.middleware.ViewMetricsMiddleware',
+    'employee.middleware.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -82,6 +85,20 @@ DATABASES = {
     }
 }
 
+# Exports and attendance reports read from a `reporting` copy when one is
+# configured: a snapshot file kept fresh by the refresh_reporting_db
+# command, or a real replica if this alias is pointed at one. Without it
+# every read stays on default. See employee.routers.
+REPORTING_DB_PATH = os.environ.get("EMS_REPORTING_DB", "")
+if REPORTING_DB_PATH:
+    DATABASES['reporting'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': REPORTING_DB_PATH,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['employee.routers.ReportingRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -121,10 +138,28 @@ STATIC_URL = "static/"
 STATICFILES_DIRS = [BASE_DIR / "employee" / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Background CSV exports (see employee.exports and run_export_worker)
+EXPORT_ROOT = BASE_DIR / "exports"
+EXPORT_JOB_REUSE_SECONDS = 15 * 60
+# A job running longer than this is taken to have lost its worker
+EXPORT_JOB_STALE_SECONDS = 60 * 60
+
+# Per-view latency and SQL metrics (see employee.metrics), served at /hr/metrics/
+VIEW_METRICS_ENABLED = os.environ.get("EMS_VIEW_METRICS", "") == "1"
+VIEW_METRICS_SLOW_QUERY_MS = 100
+VIEW_METRICS_RECENT_SIZE = 1000
+VIEW_METRICS_SLOW_QUERY_SIZE = 100
+
 LOGIN_URL = "/"
 LOGIN_REDIRECT_URL = "dashboard"
 LOGOUT_REDIRECT_URL = "/"
 
+# Failed logins per username and client address, counted in the cache (per
+# process with the default local-memory cache); further attempts are refused
+# until the window ends
+LOGIN_FAILURE_LIMIT = 5
+LOGIN_FAILURE_WINDOW = 15 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 